@@ -9,3 +9,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aiverse_api.settings')
 
 application = get_asgi_application()
+
+from events.seats import with_seat_streams  # noqa: E402 (needs the app registry)
+
+application = with_seat_streams(application)
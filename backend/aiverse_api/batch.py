@@ -0,0 +1,152 @@
+"""
+``POST /api/batch/``: run several API calls in one round trip.
+
+Each sub-request is resolved and handed to its view in this process, after
+the batch itself has passed the middleware stack once. The caller is
+authenticated once and every DRF view reuses that user. Sub-requests run in
+order, each gets its own status, and identical reads (same method, path,
+body and headers) run once and share the result unless a write came
+between them.
+"""
+import io
+import json
+import logging
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .routers import routing_for
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE')
+SAFE_METHODS = ('GET', 'HEAD')
+DEFAULT_MAX_REQUESTS = 20
+
+# Request headers a sub-request does not inherit from the batch
+OWN_HEADERS = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH')
+
+
+def not_batchable(view):
+    """Refuse ``view`` in batches, before it runs (streams subscribe to feeds when called)"""
+    view.batchable = False
+    return view
+
+
+def _sub_request(request, method, path, body, headers):
+    path, _, query = path.partition('?')
+    payload = json.dumps(body).encode() if body is not None else b''
+    environ = {key: value for key, value in request.META.items() if isinstance(value, str) and key not in OWN_HEADERS}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'HTTP_ACCEPT': 'application/json',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.input': io.BytesIO(payload),
+        'wsgi.url_scheme': request.scheme,
+    })
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+    sub = WSGIRequest(environ)
+    sub.user = request.user
+    if request.user.is_authenticated:
+        # DRF views skip their authenticators and use the batch's user
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+    return sub
+
+
+def _body(response):
+    if isinstance(response, Response):
+        return response.data
+    if response['Content-Type'].startswith('application/json'):
+        return json.loads(response.content) if response.content else None
+    return response.content.decode(response.charset or 'utf-8')
+
+
+def _run(request, spec):
+    method, path = spec['method'], spec['path']
+    try:
+        match = resolve(path.partition('?')[0])
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'}
+    if match.func is batch:
+        return status.HTTP_400_BAD_REQUEST, {'error': 'Batches cannot be nested'}
+    if not getattr(match.func, 'batchable', True):
+        return status.HTTP_400_BAD_REQUEST, {'error': 'Streaming endpoints cannot be batched'}
+
+    sub = _sub_request(request, method, path, spec.get('body'), spec.get('headers') or {})
+    sub.resolver_match = match
+    view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+    try:
+        with routing_for(sub, match.func):
+            response = view(sub, *match.args, **match.kwargs)
+    except Http404:
+        return status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'}
+    except PermissionDenied:
+        return status.HTTP_403_FORBIDDEN, {'detail': 'You do not have permission to perform this action.'}
+    except Exception:
+        logger.exception('Batch sub-request %s %s failed', method, path)
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {'detail': 'Server error.'}
+    if response.streaming:
+        response.close()  # file responses release their handle
+        return status.HTTP_400_BAD_REQUEST, {'error': 'Streaming endpoints cannot be batched'}
+    return response.status_code, _body(response)
+
+
+def _validate(specs):
+    max_requests = getattr(settings, 'BATCH_MAX_REQUESTS', DEFAULT_MAX_REQUESTS)
+    if not isinstance(specs, list) or not specs:
+        return 'requests must be a non-empty list'
+    if len(specs) > max_requests:
+        return f'At most {max_requests} requests per batch'
+    for spec in specs:
+        if not isinstance(spec, dict) or not isinstance(spec.get('path'), str) or not spec['path'].startswith('/'):
+            return 'Each request needs a path starting with /'
+        spec['method'] = str(spec.get('method', 'GET')).upper()
+        if spec['method'] not in METHODS:
+            return f"Unsupported method {spec['method']}"
+        if not isinstance(spec.get('headers') or {}, dict):
+            return 'headers must be an object'
+    return None
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def batch(request):
+    """
+    Body: ``{"requests": [{"id": "...", "method": "GET", "path": "/api/...",
+    "body": {...}, "headers": {...}}, ...]}`` (only ``path`` is required).
+    Responds 200 with ``{"responses": [{"id", "status", "body"}, ...]}`` in
+    the same order.
+    """
+    specs = request.data.get('requests') if isinstance(request.data, dict) else None
+    error = _validate(specs)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = {}
+    responses = []
+    for spec in specs:
+        key = None
+        if spec['method'] in SAFE_METHODS:
+            key = (spec['method'], spec['path'], json.dumps(spec.get('body'), sort_keys=True),
+                   json.dumps(spec.get('headers'), sort_keys=True))
+        if key is None:
+            result = _run(request, spec)
+            results.clear()  # reads after a write must see it
+        elif key not in results:
+            result = results[key] = _run(request, spec)
+        else:
+            result = results[key]
+        responses.append({'id': spec.get('id'), 'status': result[0], 'body': result[1]})
+    return Response({'responses': responses})
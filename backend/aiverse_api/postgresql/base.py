@@ -0,0 +1,89 @@
+"""
+PostgreSQL backend with an in-process psycopg connection pool.
+
+Django 4.2 only offers persistent connections. This wrapper keeps one
+``psycopg_pool.ConnectionPool`` per alias and process, configured from
+``OPTIONS['pool']`` (``min_size``, ``max_size``, ``timeout``, ``max_idle``,
+``max_lifetime``...). A request checks a connection out when it first
+touches the database and returns it when Django closes the connection at
+the end of the request. Pooled connections are health-checked on checkout
+when ``CONN_HEALTH_CHECKS`` is on. Without ``OPTIONS['pool']`` it behaves
+exactly like Django's backend.
+"""
+import threading
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+from .creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    _connection_pools = {}
+    _pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not options:
+            return None
+        # Keyed by database name too: test runs rename the database after startup
+        key = (self.alias, self.settings_dict['NAME'])
+        if key not in self._connection_pools:
+            if not is_psycopg3:
+                raise ImproperlyConfigured('Connection pooling requires psycopg 3')
+            if self.settings_dict['CONN_MAX_AGE'] != 0:
+                raise ImproperlyConfigured('Pooled connections require CONN_MAX_AGE = 0')
+            try:
+                from psycopg_pool import ConnectionPool
+            except ImportError as exc:
+                raise ImproperlyConfigured('Connection pooling requires the psycopg_pool package') from exc
+
+            pool_options = {'min_size': 1, 'max_size': 4, 'timeout': 10, 'max_idle': 300, **options}
+            if self.settings_dict['CONN_HEALTH_CHECKS']:
+                pool_options.setdefault('check', ConnectionPool.check_connection)
+            with self._pools_lock:
+                if key not in self._connection_pools:
+                    pool = ConnectionPool(kwargs=self.get_connection_params(), open=False,
+                                          name=f'django-{self.alias}', **pool_options)
+                    pool.open()
+                    self._connection_pools[key] = pool
+        return self._connection_pools[key]
+
+    def close_pool(self):
+        pool = self._connection_pools.pop((self.alias, self.settings_dict['NAME']), None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel(isolation_level) if isolation_level is not None else IsolationLevel.READ_COMMITTED
+        except ValueError:
+            raise ImproperlyConfigured(
+                f'Invalid transaction isolation level {isolation_level} specified. '
+                f'Use one of the psycopg.IsolationLevel values.'
+            )
+        connection = pool.getconn()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        pool = getattr(self.connection, '_pool', None)
+        if pool is not None:
+            # Back to the pool it came from, even if settings changed since
+            with self.wrap_database_errors:
+                pool.putconn(self.connection)
+                self.connection = None
+            return
+        return super()._close()
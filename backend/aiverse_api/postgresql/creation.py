@@ -0,0 +1,8 @@
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would block DROP DATABASE
+        self.connection.close_pool()
+        return super()._destroy_test_db(test_database_name, verbosity)
@@ -0,0 +1,225 @@
+"""
+Token-bucket rate limits shared by every worker on the host.
+
+The public write endpoints (register, login, event registration, payment
+submission, gallery uploads) accept anonymous requests. A bot or a refresh
+storm could otherwise queue work on the SQLite writer and on PBKDF2 in
+``authenticate``. The throttles here run in DRF's ``initial()``, before
+the view body, so a refused request costs a hash lookup and a 429 with
+``Retry-After``.
+
+Each scope has budgets per client IP, per submitted email and per
+authenticated user, written like DRF rates (``'5/min'``): a bucket holds
+that many requests and refills at that rate. A request needs a token from
+every bucket it maps to. When one bucket is empty the request is refused and
+takes nothing from the others.
+
+Buckets live in a fixed table of ``SLOTS`` 24-byte slots in a memory-mapped
+file, ``/dev/shm`` where available, that every gunicorn or uvicorn worker
+maps. There is no Redis and no database. A key hashes to a group of four
+slots, and a process holds an ``fcntl`` lock on that group's bytes while it
+updates them. A key that finds its group full evicts the least recently
+used slot. It starts with a full bucket, which is where an idle key would
+be anyway.
+"""
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from hashlib import blake2b
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process, the thread lock is enough
+    fcntl = None
+
+DEFAULTS = {
+    'ENABLED': True,
+    'FILE': None,       # defaults to aiverse-ratelimit in /dev/shm or the temp dir
+    'SLOTS': 65536,
+    'SCOPES': {
+        'register': {'ip': '20/hour', 'email': '5/hour'},
+        'login': {'ip': '30/min', 'email': '10/min'},
+        'registration': {'ip': '120/min', 'email': '5/min'},
+        'payment': {'ip': '60/min', 'user': '10/min'},
+        'upload': {'ip': '60/min', 'user': '30/min'},
+        'upload_chunk': {'ip': '600/min', 'user': '300/min'},
+    },
+}
+
+SLOT = struct.Struct('<Qdd')    # key hash, tokens, last update (epoch seconds)
+GROUP = 4                       # slots probed per key, locked together
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_setting(key):
+    return getattr(settings, 'RATE_LIMITS', {}).get(key, DEFAULTS[key])
+
+
+def parse_rate(rate):
+    """``'5/min'`` -> ``(5, tokens per second)``"""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period[0]]
+
+
+def _hash(key):
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+
+
+class BucketTable:
+    def __init__(self, path, slots):
+        self.path = path
+        self.groups = max(1, slots // GROUP)
+        self._lock = threading.Lock()
+        self._map = None
+        self._pid = None
+
+    def _open(self):
+        # After a fork the child maps the file itself
+        if self._map is None or self._pid != os.getpid():
+            size = self.groups * GROUP * SLOT.size
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+                self._fd = fd
+                self._map = mmap.mmap(fd, size)
+            except Exception:
+                os.close(fd)
+                raise
+            self._pid = os.getpid()
+        return self._map
+
+    def _lock_group(self, group, operation):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, operation, GROUP * SLOT.size, group * GROUP * SLOT.size)
+
+    def _find(self, table, group, key_hash, claimed):
+        """Offset of the key's slot in its group; an empty or least recently used one when it has none"""
+        base = group * GROUP * SLOT.size
+        victim, oldest = None, math.inf
+        for offset in range(base, base + GROUP * SLOT.size, SLOT.size):
+            stored, _, updated = SLOT.unpack_from(table, offset)
+            if stored == key_hash:
+                return offset, False
+            if offset not in claimed and (stored == 0 or updated < oldest):
+                victim, oldest = offset, -math.inf if stored == 0 else updated
+        return victim, True
+
+    def take(self, limits):
+        """
+        Take a token for each ``(key, capacity, rate)`` or none at all.
+        Returns 0 when allowed, else seconds until every bucket has a token.
+        """
+        entries = sorted((_hash(key) % self.groups, _hash(key), capacity, rate) for key, capacity, rate in limits)
+        with self._lock:
+            table = self._open()
+            groups = sorted({entry[0] for entry in entries})
+            for group in groups:
+                self._lock_group(group, fcntl and fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                buckets, wait = [], 0.0
+                for group, key_hash, capacity, rate in entries:
+                    offset, new = self._find(table, group, key_hash, {bucket[0] for bucket in buckets})
+                    if new:
+                        tokens = float(capacity)
+                    else:
+                        _, tokens, updated = SLOT.unpack_from(table, offset)
+                        tokens = min(float(capacity), tokens + max(now - updated, 0.0) * rate)
+                    if tokens < 1:
+                        wait = max(wait, (1 - tokens) / rate)
+                    buckets.append((offset, key_hash, tokens))
+                spend = 0 if wait else 1
+                for offset, key_hash, tokens in buckets:
+                    SLOT.pack_into(table, offset, key_hash, tokens - spend, now)
+                return wait
+            finally:
+                for group in groups:
+                    self._lock_group(group, fcntl and fcntl.LOCK_UN)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def table():
+    global _table
+    with _table_lock:
+        if _table is None:
+            path = get_setting('FILE')
+            if path is None:
+                directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+                path = os.path.join(directory, 'aiverse-ratelimit')
+            _table = BucketTable(path, get_setting('SLOTS'))
+        return _table
+
+
+class BucketThrottle(BaseThrottle):
+    """Rate limits of ``scope`` (``RATE_LIMITS['SCOPES']``) by IP, email and user"""
+    scope = None
+    # Reading the email parses the body; multipart scopes (uploads, payment
+    # screenshots) set None and are limited by IP and user only
+    email_field = 'email'
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if not get_setting('ENABLED'):
+            return True
+        budgets = get_setting('SCOPES').get(self.scope, {})
+        idents = {'ip': self.get_ident(request)}
+        if 'email' in budgets and self.email_field:
+            email = request.data.get(self.email_field) if hasattr(request.data, 'get') else None
+            if isinstance(email, str) and email.strip():
+                idents['email'] = email.strip().lower()
+        if 'user' in budgets and request.user.is_authenticated:
+            idents['user'] = str(request.user.pk)
+
+        limits = []
+        for kind, ident in idents.items():
+            if kind in budgets:
+                capacity, rate = parse_rate(budgets[kind])
+                limits.append((f'{self.scope}:{kind}:{ident}', capacity, rate))
+        if not limits:
+            return True
+        wait = table().take(limits)
+        if wait:
+            self.retry_after = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class RegisterThrottle(BucketThrottle):
+    scope = 'register'
+
+
+class LoginThrottle(BucketThrottle):
+    scope = 'login'
+
+
+class RegistrationThrottle(BucketThrottle):
+    scope = 'registration'
+
+
+class PaymentThrottle(BucketThrottle):
+    scope = 'payment'
+    email_field = None
+
+
+class UploadThrottle(BucketThrottle):
+    scope = 'upload'
+    email_field = None
+
+
+class UploadChunkThrottle(BucketThrottle):
+    scope = 'upload_chunk'
+    email_field = None
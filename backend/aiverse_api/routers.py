@@ -0,0 +1,120 @@
+"""
+Primary/replica database routing.
+
+Reads go to the primary unless the view declared read intent: a viewset
+lists the actions in ``replica_actions``, a function view is wrapped with
+``@replica_reads``. Writes always go to the primary, and a client that has
+written is pinned to the primary for ``DATABASE_REPLICA_PIN_SECONDS`` (a
+cookie), so it reads its own writes despite replication lag. Within one
+request, reads after a write stay on the primary too.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'aiverse_primary'
+
+# Per request: {'replica': bool, 'wrote': bool}, or None outside requests
+_routing = ContextVar('db_routing', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def replica_reads(view):
+    """Mark a function view as safe to serve from a replica"""
+    view.replica_reads = True
+    return view
+
+
+def wants_replica(request, view_func):
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return False
+    if getattr(view_func, 'replica_reads', False):
+        return True
+    # DRF viewsets: as_view() keeps the class and the method -> action map
+    view_class = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(request.method.lower())
+    return action is not None and action in getattr(view_class, 'replica_actions', ())
+
+
+@contextmanager
+def routing_for(request, view_func):
+    """Route an in-process sub-request (``/api/batch/``) like a request of its own"""
+    outer = _routing.get()
+    state = {'replica': False, 'wrote': bool(outer and outer['wrote'])}
+    if outer is not None and PIN_COOKIE not in request.COOKIES:
+        state['replica'] = wants_replica(request, view_func)
+    token = _routing.set(state)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+        if outer is not None and state['wrote']:
+            outer['wrote'] = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state and state['replica'] and not state['wrote']:
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = {'replica': False, 'wrote': False}
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self._pin(state, response)
+
+    async def __acall__(self, request):
+        state = {'replica': False, 'wrote': False}
+        token = _routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self._pin(state, response)
+
+    def _pin(self, state, response):
+        if state['wrote'] and replica_aliases():
+            response.set_cookie(PIN_COOKIE, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing.get()
+        if state is not None and PIN_COOKIE not in request.COOKIES:
+            state['replica'] = wants_replica(request, view_func)
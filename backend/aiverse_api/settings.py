@@ -4,6 +4,8 @@ Django settings for aiverse_api project.
 
 from pathlib import Path
 from datetime import timedelta
+from decouple import Csv, config
+from .database import database_config, pool_size
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,9 +37,19 @@ INSTALLED_APPS = [
     'events',
     'payments',
     'analytics',
+    'files',
+    'taskqueue',
+    'notifications',
+    'changes',
+    'idempotency',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.PerformanceMiddleware',  # first, so it times the whole stack
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
+    'aiverse_api.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -69,13 +81,42 @@ TEMPLATES = [
 WSGI_APPLICATION = 'aiverse_api.wsgi.application'
 
 # Database
+# Database from DATABASE_URL (see aiverse_api/database.py). Defaults to the
+# tuned SQLite backend; PostgreSQL gets a per-process connection pool.
+DATABASE_URL = config('DATABASE_URL', default='sqlite:///db.sqlite3')
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+# Connections the server allows us, split across WEB_CONCURRENCY processes
+# of WEB_THREADS threads each
+DB_MAX_CONNECTIONS = config('DB_MAX_CONNECTIONS', default=80, cast=int)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=4, cast=int)
+WEB_THREADS = config('WEB_THREADS', default=1, cast=int)
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(
+        DATABASE_URL,
+        BASE_DIR,
+        pool={
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=pool_size(DB_MAX_CONNECTIONS, WEB_CONCURRENCY, WEB_THREADS), cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'max_idle': 300,
+            'max_lifetime': 3600,
+        } if DB_POOL else None,
+        conn_max_age=config('CONN_MAX_AGE', default=600, cast=int),
+    ),
 }
 
+# Read replicas, comma-separated URLs: become replica_0, replica_1, ...
+# Views opt in to replica reads (see aiverse_api/routers.py)
+for index, url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv())):
+    DATABASES[f'replica_{index}'] = {
+        **database_config(url, BASE_DIR, conn_max_age=config('CONN_MAX_AGE', default=600, cast=int)),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['aiverse_api.routers.ReplicaRouter']
+# How long a client that wrote keeps reading from the primary
+DATABASE_REPLICA_PIN_SECONDS = config('DATABASE_REPLICA_PIN_SECONDS', default=5, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -106,6 +147,20 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media delivery: None streams files from Django, 'nginx' hands off with
+# X-Accel-Redirect to MEDIA_ACCEL_PREFIX, 'sendfile' uses X-Sendfile (Apache/lighttpd)
+MEDIA_ACCEL_REDIRECT = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 7
+MEDIA_SIGNED_URL_MAX_AGE = 60 * 60 * 6
+
+# Resumable chunked uploads (files app); keep the temp dir on the same
+# filesystem as MEDIA_ROOT so finished uploads are moved, not copied
+CHUNKED_UPLOAD_DIR = BASE_DIR / 'uploads_tmp'
+CHUNKED_UPLOAD_CHUNK_SIZE = 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY = timedelta(days=1)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -115,13 +170,52 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
+    # Proxies in front of Django. 0 keys throttles on REMOTE_ADDR; behind a
+    # proxy (Render has one) set NUM_PROXIES=1 so they key on the client
+    # address it appends to X-Forwarded-For, the one hop clients cannot forge
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+}
+
+# Token buckets for the anonymous write endpoints (aiverse_api/ratelimit.py),
+# shared by the workers on a host through a memory-mapped file. Budgets per
+# scope and per client IP, submitted email and authenticated user
+RATE_LIMITS = {
+    'ENABLED': True,
+    'SCOPES': {
+        'register': {'ip': '20/hour', 'email': '5/hour'},
+        'login': {'ip': '30/min', 'email': '10/min'},
+        'registration': {'ip': '120/min', 'email': '5/min'},
+        'payment': {'ip': '60/min', 'user': '10/min'},
+        'upload': {'ip': '60/min', 'user': '30/min'},
+        'upload_chunk': {'ip': '600/min', 'user': '300/min'},
+    },
+}
+
+# Idempotency-Key on registration and payment submissions (idempotency.keys):
+# retries within TTL_SECONDS get the first response. Run
+# `manage.py compact_idempotency_keys` daily
+IDEMPOTENCY = {
+    'TTL_SECONDS': 24 * 60 * 60,
+    'WAIT_SECONDS': 15,
+    'LOCK_SECONDS': 60,
+}
+
+# Most sub-requests accepted by POST /api/batch/
+BATCH_MAX_REQUESTS = 20
+
+# ?since=<cursor> delta mode on the admin lists (payments, registrations, users).
+# Run `manage.py compact_tombstones` daily; cursors older than TOMBSTONE_DAYS get 410
+CHANGE_FEED = {
+    'PAGE_SIZE': 500,
+    'LAG_SECONDS': 5,
+    'TOMBSTONE_DAYS': 7,
 }
 
 # JWT settings
@@ -131,6 +225,8 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
+    # Tokens carry a hash of the password hash; a password change revokes them
+    'CHECK_REVOKE_TOKEN': True,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -138,6 +234,116 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Snapshot of the authenticated user's permission fields, so most API calls
+# make no user query (users.authentication). Saving a user drops it; other
+# workers see the save by polling users.updated_at every REFRESH_SECONDS
+AUTH_USER_CACHE = {
+    'CACHE': 'default',
+    'TIMEOUT': 60,
+    'REFRESH_SECONDS': 2,
+}
+
+# Revoked JWTs (logout, refresh rotation): a per-process bloom filter in front
+# of users.RevokedToken, refreshed from the table every REFRESH_SECONDS.
+# Run `manage.py compact_revoked_tokens` daily
+TOKEN_REVOCATION = {
+    'REFRESH_SECONDS': 2,
+    'REBUILD_SECONDS': 60 * 60,
+    'FALSE_POSITIVE_RATE': 0.01,
+    'MIN_CAPACITY': 10000,
+}
+
+# Background task queue (run with `python manage.py run_worker`)
+TASKQUEUE = {
+    'WORKERS': 4,
+    'POOL': 'thread',          # 'thread' or 'process'
+    'POLL_INTERVAL': 1.0,      # seconds between polls when the queue is empty
+    'BATCH_SIZE': 10,          # tasks claimed per poll
+    'LEASE_SECONDS': 300,      # running tasks older than this are reclaimed
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,        # first retry delay in seconds, doubled per attempt
+    'RETRY_BACKOFF_MAX': 60 * 60,
+    'EAGER': False,            # run tasks in-process on commit (no worker needed)
+}
+
+# Email: the console backend prints messages locally; use
+# 'django.core.mail.backends.smtp.EmailBackend' with EMAIL_HOST etc. in production
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'AI Verse <noreply@aiverse.com>'
+
+# Admission queue for events with max_participants (events.admissions): each
+# batch admits up to BATCH_SIZE queued registrations against the seats left,
+# at most once per BATCH_WINDOW seconds per event (run by the task workers)
+ADMISSIONS = {
+    'BATCH_SIZE': 200,
+    'BATCH_WINDOW': 1,
+}
+
+# Batched notification emails (sent by the task queue workers)
+NOTIFICATIONS = {
+    'BATCH_SIZE': 100,              # messages per SMTP connection
+    'BATCH_WINDOW': 5,              # seconds to gather messages before sending
+    'RATE_LIMIT_PER_MINUTE': 120,
+    'MAX_ATTEMPTS': 3,
+    'LEASE_SECONDS': 300,           # rows left 'sending' by a crashed dispatcher are retried after this
+}
+
+# Entry passes: defaults to SECRET_KEY; set separately to rotate passes on its own
+ENTRY_PASS_SECRET = None
+CHECK_IN_MAX_BATCH = 500
+
+# Request instrumentation (monitoring app): Server-Timing headers plus
+# slow request / slow query logs on the 'monitoring' loggers
+PERFORMANCE = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_QUERY_MS': 100,
+}
+
+# Prometheus metrics at /metrics. Each worker process writes its own file in
+# DIR; point it at a tmpfs and empty it when the server starts. Without a
+# token only direct requests from private addresses are served
+METRICS = {
+    'ENABLED': True,
+    'DIR': BASE_DIR / 'metrics_data',
+    'AUTH_TOKEN': config('METRICS_TOKEN', default=None),   # require 'Authorization: Bearer <token>'
+    'PUBLIC': False,      # True serves anyone when no token is set
+}
+
+# On-demand profiling: admins add ?__profile=cpu|sql|mem|all to any request and
+# browse captures at /api/profiles/. Off unless enabled here
+PROFILING = {
+    'ENABLED': False,
+    'DIR': BASE_DIR / 'profiles',
+    'MAX_CAPTURES': 50,
+}
+
+# Live feeds (admin dashboard /api/analytics/live/, seats /api/events/<slug>/seats/):
+# one producer per process polls for changes and fans them out to every open stream
+LIVE_FEED = {
+    'POLL_SECONDS': 1.0,
+    'STATS_SECONDS': 30,
+    'SEATS_SECONDS': 0.5,
+    'HEARTBEAT_SECONDS': 15,
+    'STREAM_SECONDS': 300,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'monitoring': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'analytics': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8080",
@@ -167,4 +373,5 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
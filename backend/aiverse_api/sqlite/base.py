@@ -0,0 +1,111 @@
+"""
+SQLite backend tuned for concurrent writers.
+
+- PRAGMAs from ``OPTIONS['pragmas']`` run on every new connection (WAL,
+  ``synchronous=NORMAL``, mmap and page cache sizes, ...).
+- ``OPTIONS['transaction_mode'] = 'IMMEDIATE'`` starts ``atomic`` blocks with
+  ``BEGIN IMMEDIATE`` so a transaction that reads and then writes takes the
+  write lock up front instead of failing with "database is locked" on upgrade
+  (the same option Django 5.1 added to its own backend).
+- Writers in one process queue on a lock instead of spinning in SQLite's
+  busy handler: an ``atomic`` block holds it until commit/rollback, an
+  autocommit write statement for its duration.
+"""
+import threading
+from django.db.backends.sqlite3 import base
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def write_lock(name):
+    """The process-wide writer lock for one database file"""
+    with _locks_guard:
+        return _locks.setdefault(str(name), threading.Lock())
+
+
+class CursorWrapper(base.SQLiteCursorWrapper):
+    lock = None
+    timeout = None
+
+    def execute(self, query, params=None):
+        if self.lock is None or self.connection.in_transaction or not query.lstrip().upper().startswith(WRITE_STATEMENTS):
+            return super().execute(query, params)
+        acquired = self.lock.acquire(timeout=self.timeout)
+        try:
+            return super().execute(query, params)
+        finally:
+            if acquired:
+                self.lock.release()
+
+    def executemany(self, query, param_list):
+        if self.lock is None or self.connection.in_transaction:
+            return super().executemany(query, param_list)
+        acquired = self.lock.acquire(timeout=self.timeout)
+        try:
+            return super().executemany(query, param_list)
+        finally:
+            if acquired:
+                self.lock.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    holds_write_lock = False
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = kwargs.pop('pragmas', {})
+        self.transaction_mode = kwargs.pop('transaction_mode', 'DEFERRED').upper()
+        self.write_lock = write_lock(kwargs['database']) if kwargs.pop('write_lock', True) else None
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise base.ImproperlyConfigured(f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}")
+        # sqlite3's timeout (seconds) is the busy handler; reuse it for the lock
+        self.lock_timeout = kwargs.get('timeout', 5)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=CursorWrapper)
+        cursor.lock = self.write_lock
+        cursor.timeout = self.lock_timeout
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        if self.write_lock is not None:
+            self.holds_write_lock = self.write_lock.acquire(timeout=self.lock_timeout)
+        try:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        except Exception:
+            self._release_write_lock()
+            raise
+
+    def _release_write_lock(self):
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            self.write_lock.release()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._release_write_lock()
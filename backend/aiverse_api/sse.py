@@ -0,0 +1,135 @@
+"""
+Server-Sent Events plumbing shared by the live feeds.
+
+A feed runs one producer thread per process and hands each encoded message
+to every subscriber. A subscriber is a queue drained by one open response:
+an ``asyncio.Queue`` on the event loop under ASGI, a blocking queue in the
+worker thread under WSGI.
+"""
+import asyncio
+import json
+import queue
+import time
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+DEFAULTS = {
+    'POLL_SECONDS': 1.0,        # how often producers look for changes
+    'STATS_SECONDS': 30,        # recompute dashboard counters at least this often
+    'SEATS_SECONDS': 0.5,       # at most one seat update per event per this interval
+    'HEARTBEAT_SECONDS': 15,    # comment line that keeps proxies from closing idle streams
+    'STREAM_SECONDS': 300,      # end a stream after this long; the browser reconnects and resumes
+    'BACKLOG': 200,             # recent activities kept for Last-Event-ID resume
+    'QUEUE_SIZE': 500,          # a subscriber this far behind is disconnected
+}
+
+HEARTBEAT = b': keep-alive\n\n'
+
+
+def get_setting(key):
+    return getattr(settings, 'LIVE_FEED', {}).get(key, DEFAULTS[key])
+
+
+def encode(event, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class Subscriber:
+    """A blocking queue for streams served from a WSGI worker thread"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.closed = False
+
+    def send(self, chunk):
+        if self.queue.qsize() >= get_setting('QUEUE_SIZE'):
+            self.close()
+        else:
+            self.queue.put_nowait(chunk)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.queue.put_nowait(None)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return HEARTBEAT
+
+
+class AsyncSubscriber(Subscriber):
+    """Hands chunks from a producer thread to a stream on an event loop"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    def send(self, chunk):
+        self.loop.call_soon_threadsafe(super().send, chunk)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return HEARTBEAT
+
+
+def subscriber_for(request):
+    if isinstance(request, ASGIRequest):
+        return AsyncSubscriber(asyncio.get_running_loop())
+    return Subscriber()
+
+
+def _stream(subscriber, initial, unsubscribe):
+    deadline = time.monotonic() + get_setting('STREAM_SECONDS')
+    try:
+        yield b'retry: 3000\n\n'
+        yield from initial
+        while time.monotonic() < deadline:
+            chunk = subscriber.get(get_setting('HEARTBEAT_SECONDS'))
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        unsubscribe()
+
+
+async def async_stream(subscriber, initial, unsubscribe):
+    deadline = time.monotonic() + get_setting('STREAM_SECONDS')
+    try:
+        yield b'retry: 3000\n\n'
+        for chunk in initial:
+            yield chunk
+        while time.monotonic() < deadline:
+            chunk = await subscriber.get(get_setting('HEARTBEAT_SECONDS'))
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        unsubscribe()
+
+
+def event_stream(subscriber, initial, unsubscribe):
+    """
+    The streaming response for a subscriber: ``initial`` chunks, then what
+    the producer sends, with heartbeats. The stream ends after
+    ``STREAM_SECONDS`` (Django 4.2 does not report ASGI disconnects, so this
+    also bounds streams whose client went away) or when the subscriber
+    falls too far behind; ``unsubscribe`` runs either way.
+    """
+    stream = async_stream if isinstance(subscriber, AsyncSubscriber) else _stream
+    return with_stream_headers(StreamingHttpResponse(stream(subscriber, initial, unsubscribe)))
+
+
+def with_stream_headers(response):
+    response['Content-Type'] = 'text/event-stream'
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
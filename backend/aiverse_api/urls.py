@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .batch import batch
 
 urlpatterns = [
     path('django-admin/', admin.site.urls),
@@ -15,9 +16,12 @@ urlpatterns = [
     path('api/registrations/', include('events.registration_urls')),
     path('api/admin/dashboard/', include('analytics.urls')),
     path('api/analytics/', include('analytics.urls')),
+    path('api/uploads/', include('files.upload_urls')),
+    path('api/batch/', batch, name='batch'),
+    path('media/', include('files.urls')),
+    path('', include('monitoring.urls')),
 ]
 
-# Serve media files in development
+# Serve static files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
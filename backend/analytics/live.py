@@ -0,0 +1,149 @@
+"""
+Live admin dashboard feed (Server-Sent Events).
+
+One producer thread per process tails the ``Activity`` table by primary key
+and recomputes the dashboard counters when something happened. Each new
+activity and each counter change is encoded once and fanned out to every
+open stream in the process, so the database sees the same queries whether
+one admin tab is open or fifty. The producer starts with the first
+subscriber and stops when the last one leaves.
+
+Activities carry their id as the SSE event id, so a reconnecting browser
+sends ``Last-Event-ID`` and gets what it missed, from an in-memory backlog
+or, after a restart, from the database.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from django.db import DatabaseError, close_old_connections, connections
+from aiverse_api.sse import encode, get_setting
+from .models import Activity
+from .stats import dashboard_stats, serialize_activity
+
+logger = logging.getLogger(__name__)
+
+# Activities commit out of id order when transactions overlap, so each poll
+# re-reads this many ids below the cursor and skips the ones already sent
+ID_SLACK = 100
+
+
+def counter_deltas(old, new):
+    deltas = {}
+    for key, value in new.items():
+        change = value - old.get(key, 0)
+        if change:
+            deltas[key] = round(change, 2) if isinstance(change, float) else change
+    return deltas
+
+
+class Feed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers = set()
+        self._backlog = deque()
+        self._sent_ids = set()
+        self._cursor = 0
+        self._stats = None
+        self._stats_at = 0.0
+        self._thread = None
+
+    def subscribe(self, subscriber, last_event_id=None):
+        """
+        Register a subscriber and return the chunks it should send first: any
+        activities after ``last_event_id``, then a ``stats`` snapshot tagged
+        with the current cursor. Later messages arrive through the subscriber.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            self._subscribers.add(subscriber)
+            initial = list(self._replay(last_event_id)) if last_event_id is not None else []
+            initial.append(encode('stats', self._stats, event_id=self._cursor))
+        return initial
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def wake(self):
+        """Poll now instead of at the next interval (after a local commit)"""
+        self._wake.set()
+
+    def _start(self):
+        recent = list(Activity.objects.select_related('user').order_by('-id')[:get_setting('BACKLOG')])
+        self._backlog.clear()
+        self._sent_ids.clear()
+        for activity in reversed(recent):
+            self._remember(activity)
+        self._cursor = recent[0].id if recent else 0
+        self._stats = dashboard_stats()
+        self._stats_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='live-feed', daemon=True)
+        self._thread.start()
+
+    def _remember(self, activity):
+        chunk = encode('activity', serialize_activity(activity), event_id=activity.id)
+        self._backlog.append((activity.id, chunk))
+        self._sent_ids.add(activity.id)
+        while len(self._backlog) > get_setting('BACKLOG'):
+            self._sent_ids.discard(self._backlog.popleft()[0])
+        return chunk
+
+    def _replay(self, last_event_id):
+        if self._backlog and self._backlog[0][0] > last_event_id + 1:
+            # The client missed more than the backlog holds; send the most
+            # recent of the gap from the database, then the backlog
+            missed = Activity.objects.select_related('user').filter(
+                id__gt=last_event_id, id__lt=self._backlog[0][0],
+            ).order_by('-id')[:get_setting('BACKLOG')]
+            for activity in reversed(list(missed)):
+                yield encode('activity', serialize_activity(activity), event_id=activity.id)
+        for activity_id, chunk in self._backlog:
+            if activity_id > last_event_id:
+                yield chunk
+
+    def _publish(self, chunk):
+        for subscriber in list(self._subscribers):
+            subscriber.send(chunk)
+            if subscriber.closed:
+                self._subscribers.discard(subscriber)
+
+    def _run(self):
+        while True:
+            self._wake.wait(get_setting('POLL_SECONDS'))
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    break
+            try:
+                close_old_connections()
+                self._poll()
+            except DatabaseError:
+                logger.exception('Live feed poll failed')
+        connections.close_all()
+
+    def _poll(self):
+        floor = max(self._cursor - ID_SLACK, 0)
+        rows = list(Activity.objects.select_related('user').filter(id__gt=floor).exclude(
+            id__in=[activity_id for activity_id in self._sent_ids if activity_id > floor],
+        ).order_by('id')[:get_setting('BACKLOG')])
+        if len(rows) == get_setting('BACKLOG'):
+            self._wake.set()  # more waiting; poll again straight away
+        refresh = rows or time.monotonic() - self._stats_at >= get_setting('STATS_SECONDS')
+        stats = dashboard_stats() if refresh else None
+        with self._lock:
+            for activity in rows:
+                self._publish(self._remember(activity))
+                self._cursor = max(self._cursor, activity.id)
+            if stats is not None:
+                deltas = counter_deltas(self._stats, stats)
+                self._stats = stats
+                self._stats_at = time.monotonic()
+                if deltas:
+                    self._publish(encode('counters', deltas))
+
+
+feed = Feed()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['-timestamp'], name='analytics_a_timesta_c00c8b_idx'),
+        ),
+    ]
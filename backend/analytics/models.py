@@ -21,6 +21,9 @@ class Activity(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp']),
+        ]
         verbose_name = 'Activity'
         verbose_name_plural = 'Activities'
     
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Activity
+from .live import feed
+
+
+@receiver(post_save, sender=Activity)
+def wake_live_feed(sender, instance, created, **kwargs):
+    # Streams served by this process see the activity without waiting for
+    # the next poll; other processes pick it up on theirs
+    if created:
+        transaction.on_commit(feed.wake)
@@ -0,0 +1,55 @@
+"""
+Dashboard counters and activity rows, shared by the dashboard endpoint and
+the live feed.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from events.models import Event
+from payments.models import Payment
+
+User = get_user_model()
+
+
+def dashboard_stats():
+    """The dashboard's headline counters in four queries"""
+    # Grouping the two statuses reads them through the (status, -submitted_at)
+    # index; conditional aggregates over the whole table would scan it
+    by_status = {
+        row['status']: row
+        for row in Payment.objects.filter(status__in=['pending', 'approved']).order_by()
+        .values('status').annotate(n=Count('id'), revenue=Sum('amount'))
+    }
+    pending = by_status.get('pending', {})
+    approved = by_status.get('approved', {})
+    payments = {
+        'total': Payment.objects.count(),
+        'pending': pending.get('n', 0),
+        'approved': approved.get('n', 0),
+        'total_revenue': approved.get('revenue'),
+        'pending_revenue': pending.get('revenue'),
+    }
+    events = Event.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status__in=['upcoming', 'ongoing'])),
+    )
+    return {
+        'total_users': User.objects.count(),
+        'total_events': events['total'],
+        'active_events': events['active'],
+        'total_registrations': payments['total'],
+        'total_payments': payments['total'],
+        'pending_payments': payments['pending'],
+        'approved_payments': payments['approved'],
+        'total_revenue': float(payments['total_revenue'] or 0),
+        'pending_revenue': float(payments['pending_revenue'] or 0),
+    }
+
+
+def serialize_activity(activity):
+    return {
+        'id': activity.id,
+        'user': activity.user.full_name or activity.user.email,
+        'action': activity.action,
+        'type': activity.activity_type,
+        'time': activity.timestamp.isoformat(),
+    }
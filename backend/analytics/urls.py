@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.dashboard, name='analytics-dashboard'),
+    path('live/', views.live_feed, name='analytics-live'),
 ]
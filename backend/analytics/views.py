@@ -1,3 +1,6 @@
+import logging
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
@@ -7,53 +10,37 @@ from datetime import timedelta
 from events.models import Event
 from payments.models import Payment
 from .models import Activity
+from .stats import dashboard_stats, serialize_activity
+from . import live
 from users.views import IsAdminUser
+from aiverse_api import sse
+from aiverse_api.batch import not_batchable
+from aiverse_api.routers import replica_reads
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 from rest_framework.permissions import AllowAny
 
+@replica_reads
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def dashboard(request):
     """Dashboard analytics endpoint"""
     user_email = request.user.email if not request.user.is_anonymous else "Anonymous"
     is_admin = request.user.is_admin if not request.user.is_anonymous else False
-    print(f"Analytics dashboard accessed by: {user_email} (Admin: {is_admin})")
+    logger.info("Analytics dashboard accessed by: %s (Admin: %s)", user_email, is_admin)
     
     # Get date range for chart data (last 30 days)
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30)
     
-    # Basic stats
-    total_users = User.objects.count()
-    total_events = Event.objects.count()
-    total_payments = Payment.objects.count()
-    pending_payments = Payment.objects.filter(status='pending').count()
-    approved_payments = Payment.objects.filter(status='approved').count()
-    
-    # Revenue stats
-    total_revenue = Payment.objects.filter(status='approved').aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-    
-    pending_revenue = Payment.objects.filter(status='pending').aggregate(
-        total=Sum('amount')
-    )['total'] or 0
+    stats = dashboard_stats()
     
     # Recent activities (last 10)
     recent_activities = Activity.objects.select_related('user').order_by('-timestamp')[:10]
-    activities_data = [
-        {
-            'id': activity.id,
-            'user': activity.user.full_name or activity.user.email,
-            'action': activity.action,
-            'type': activity.activity_type,
-            'time': activity.timestamp.isoformat(),
-        }
-        for activity in recent_activities
-    ]
+    activities_data = [serialize_activity(activity) for activity in recent_activities]
     
     # Chart data - registrations over time
     registrations_by_day = []
@@ -71,8 +58,8 @@ def dashboard(request):
     
     # Payment status distribution
     payment_status_distribution = [
-        {'status': 'Pending', 'count': pending_payments},
-        {'status': 'Approved', 'count': approved_payments},
+        {'status': 'Pending', 'count': stats['pending_payments']},
+        {'status': 'Approved', 'count': stats['approved_payments']},
         {'status': 'Rejected', 'count': Payment.objects.filter(status='rejected').count()},
     ]
     
@@ -84,17 +71,7 @@ def dashboard(request):
     ]
     
     return Response({
-        'stats': {
-            'total_users': total_users,
-            'total_events': total_events,
-            'active_events': Event.objects.filter(status='upcoming').count() + Event.objects.filter(status='ongoing').count(),
-            'total_registrations': total_payments,
-            'total_payments': total_payments,
-            'pending_payments': pending_payments,
-            'approved_payments': approved_payments,
-            'total_revenue': float(total_revenue),
-            'pending_revenue': float(pending_revenue),
-        },
+        'stats': stats,
         'activities': activities_data,
         'chart_data': {
             'registrations_by_day': registrations_by_day,
@@ -102,3 +79,43 @@ def dashboard(request):
             'event_status_distribution': event_status_distribution,
         }
     })
+
+
+def _stream_admin(request):
+    """
+    The admin behind the request's JWT. ``EventSource`` cannot send headers,
+    so the access token may also come as ``?token=``.
+    """
+    from rest_framework.exceptions import AuthenticationFailed
+    from users.authentication import CachedJWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    try:
+        raw_token = authentication.get_raw_token(header) if header else request.GET.get('token')
+        if not raw_token:
+            return None
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return user if user.is_active and user.is_admin else None
+
+
+@not_batchable
+async def live_feed(request):
+    """
+    Server-Sent Events stream of new activities (``activity``, with the
+    activity id as event id) and counter changes (``counters``, deltas
+    against the ``stats`` snapshot sent on connect). Serve it from the ASGI
+    server: under WSGI each open stream holds a worker thread.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    if await sync_to_async(_stream_admin)(request) is None:
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+    
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    last_event_id = int(cursor) if cursor and cursor.isdigit() else None
+    subscriber = sse.subscriber_for(request)
+    initial = await sync_to_async(live.feed.subscribe)(subscriber, last_event_id)
+    return sse.event_stream(subscriber, initial, lambda: live.feed.unsubscribe(subscriber))
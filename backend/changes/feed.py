@@ -0,0 +1,110 @@
+"""
+``?since=<cursor>`` delta mode for admin lists.
+
+A client loads a list once with ``?since=0``, keeps the ``cursor`` it gets
+back and polls with it. Each poll reads the rows whose ``updated_at`` is at
+or after the cursor (through an ``(updated_at, id)`` index) plus the
+tombstones of rows deleted since then, so its cost follows the number of
+changes rather than the size of the table::
+
+    {"results": [...], "deleted": [ids], "cursor": "...", "more": false}
+
+``results`` are upserted by id. ``deleted`` lists ids to drop: deleted rows,
+and changed rows that no longer match the list's filters. With ``more`` the
+page was full and the client should ask again straight away.
+
+A poll cursor sits ``LAG_SECONDS`` before the time it was issued. A row is
+stamped when it is saved but only becomes visible when its transaction
+commits, so a cursor at "now" could skip rows committing just behind it.
+The overlap means some rows arrive twice; upserting makes that harmless.
+Tombstones are compacted after ``TOMBSTONE_DAYS``
+(``manage.py compact_tombstones``); older cursors get ``410 Gone`` and the
+client starts again from ``since=0``.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .models import Tombstone
+
+DEFAULTS = {
+    'PAGE_SIZE': 500,       # most changed rows per response
+    'LAG_SECONDS': 5,       # how far behind "now" poll cursors sit; longer than any write transaction
+    'TOMBSTONE_DAYS': 7,    # deletes are reported to cursors at most this old
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def get_setting(key):
+    return getattr(settings, 'CHANGE_FEED', {}).get(key, DEFAULTS[key])
+
+
+def encode_cursor(moment, pk=0):
+    """``<microseconds since epoch>`` for polls, ``-<id>`` appended inside a full page run"""
+    delta = moment - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
+    return f'{micros}-{pk}' if pk else str(micros)
+
+
+def decode_cursor(cursor):
+    """``(moment, pk)``; raises ValueError for anything that is not a cursor"""
+    micros, _, pk = cursor.partition('-')
+    if not micros.isdigit() or (pk and not pk.isdigit()):
+        raise ValueError(cursor)
+    try:
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk or 0)
+    except OverflowError:
+        raise ValueError(cursor)
+
+
+class ChangeFeedMixin:
+    """
+    Adds ``?since=`` to a viewset's ``list``. The model needs an indexed
+    ``updated_at`` and tombstones (``changes.signals``); query-param filters
+    belong in ``filter_queryset`` so rows that stop matching them can be
+    reported, while ``get_queryset`` keeps what the caller may see.
+    """
+
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        if since is None:
+            return super().list(request, *args, **kwargs)
+        try:
+            moment, pk = decode_cursor(since)
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        full_load = moment == EPOCH and not pk
+        # Continuation cursors (with an id) only follow rows already handed
+        # out, so only poll cursors depend on tombstones still being there
+        if not full_load and not pk and moment < now - timedelta(days=get_setting('TOMBSTONE_DAYS')):
+            return Response({'error': 'Cursor expired; reload with since=0'}, status=status.HTTP_410_GONE)
+
+        page_size = get_setting('PAGE_SIZE')
+        rows = list(self.get_queryset().filter(
+            Q(updated_at__gt=moment) | Q(updated_at=moment, id__gt=pk),
+        ).order_by('updated_at', 'id')[:page_size + 1])
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        matching = set()
+        if rows:
+            matching = set(self.filter_queryset(self.get_queryset().filter(
+                id__in=[row.id for row in rows],
+            )).order_by().values_list('id', flat=True))
+        deleted = [row.id for row in rows if row.id not in matching]
+        if not full_load:
+            deleted += Tombstone.objects.filter(
+                model=self.get_queryset().model._meta.label_lower, deleted_at__gte=moment,
+            ).values_list('object_id', flat=True)
+
+        if more:
+            cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
+        else:
+            cursor = encode_cursor(now - timedelta(seconds=get_setting('LAG_SECONDS')))
+        serializer = self.get_serializer([row for row in rows if row.id in matching], many=True)
+        return Response({'results': serializer.data, 'deleted': deleted, 'cursor': cursor, 'more': more})
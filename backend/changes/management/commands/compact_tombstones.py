@@ -0,0 +1,14 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from changes.feed import get_setting
+from changes.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete tombstones older than CHANGE_FEED TOMBSTONE_DAYS (older ?since= cursors get 410)'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=get_setting('TOMBSTONE_DAYS'))
+        count, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Compacted {count} tombstones'))
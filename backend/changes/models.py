@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """A deleted row, kept long enough for ``?since=`` readers to drop it"""
+    model = models.CharField(max_length=100, help_text="app_label.model of the deleted row")
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at']),
+        ]
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+    
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
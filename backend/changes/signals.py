@@ -0,0 +1,14 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from events.models import EventRegistration
+from payments.models import Payment
+from .models import Tombstone
+
+
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=EventRegistration)
+@receiver(post_delete, sender=get_user_model())
+def record_tombstone(sender, instance, **kwargs):
+    # Cascades fire this per row, inside the deleting transaction
+    Tombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event, EventImage, EventRegistration
+from .models import Admission, CheckIn, Event, EventImage, EventRegistration
 
 
 class EventImageInline(admin.TabularInline):
@@ -30,3 +30,20 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     list_filter = ['event', 'is_active', 'registered_at']
     search_fields = ['user__email', 'event__title']
     ordering = ['-registered_at']
+
+
+@admin.register(Admission)
+class AdmissionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'event', 'status', 'created_at', 'admitted_at']
+    list_filter = ['event', 'status']
+    search_fields = ['user__email']
+    readonly_fields = ['registration', 'created_at', 'admitted_at']
+    ordering = ['id']
+
+
+@admin.register(CheckIn)
+class CheckInAdmin(admin.ModelAdmin):
+    list_display = ['registration', 'event', 'scanned_at', 'device', 'received_at']
+    list_filter = ['event', 'device']
+    search_fields = ['registration__user__email']
+    ordering = ['-scanned_at']
@@ -0,0 +1,157 @@
+"""
+Admission queue and waitlist for capacity-limited events.
+
+When registration opens for an event with ``max_participants``, everyone
+submits at once. Checking ``is_full`` and then inserting cannot hold the
+cap: concurrent requests all see the last free seat. Instead a submission
+only appends an ``Admission`` row and is answered ``202`` with its place
+in the queue. An ``admit_registrations`` task, scheduled at most once per
+``BATCH_WINDOW`` per event, takes up to ``BATCH_SIZE`` waiting entries in
+order. Inside one transaction that locks the event row, it compares them
+with the seats left. Entries that fit become registrations, created in bulk
+with the usual ``post_save`` side effects. The rest are waitlisted and
+emailed that they are. Because admissions for an event never run
+concurrently, the cap cannot be exceeded, and the writes arrive in one batch
+per window however sharp the burst.
+
+A seat frees when a registration is deactivated or deleted, or its payment
+is rejected. Those schedule the task again, which promotes the waitlist in
+order, in bulk. An approved payment for a registration that gave up its
+seat goes back through the queue rather than reclaiming the seat.
+Events without ``max_participants`` register directly (``registrations``).
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from notifications.dispatch import notify_many
+from . import seats
+from .models import Admission, Event, EventRegistration
+from .passes import approved, issue_passes
+
+DEFAULTS = {
+    'BATCH_SIZE': 200,      # entries admitted or waitlisted per transaction
+    'BATCH_WINDOW': 1,      # seconds between admission batches per event
+}
+
+
+def get_setting(key):
+    return getattr(settings, 'ADMISSIONS', {}).get(key, DEFAULTS[key])
+
+
+def position(admission):
+    """1-based place among the event's waiting entries, None once admitted"""
+    if admission.status not in Admission.WAITING:
+        return None
+    return Admission.objects.filter(
+        event_id=admission.event_id, status__in=Admission.WAITING, id__lte=admission.id,
+    ).count()
+
+
+def enqueue(user, event):
+    """Append ``user`` to ``event``'s queue, or return the entry they already have"""
+    try:
+        with transaction.atomic():
+            admission = Admission.objects.create(user=user, event=event)
+    except IntegrityError:
+        admission = Admission.objects.get(user=user, event=event, status__in=Admission.WAITING)
+    else:
+        transaction.on_commit(lambda: schedule_admission(event.pk))
+    return admission
+
+
+def schedule_admission(event_id, delay=None):
+    """Ensure one admission batch for the event runs at the end of the current window"""
+    from .tasks import admit_registrations
+
+    window = get_setting('BATCH_WINDOW')
+    run_at = timezone.now() + timedelta(seconds=window if delay is None else delay)
+    bucket = int(run_at.timestamp() // max(window, 1))
+    admit_registrations.enqueue(args=[event_id], idempotency_key=f'admissions:{event_id}:{bucket}', run_at=run_at)
+
+
+def seats_freed(event_id):
+    """Promote the waitlist once the current transaction commits"""
+    transaction.on_commit(lambda: schedule_admission(event_id, delay=0))
+
+
+def admit(event_id):
+    """Admit or waitlist one batch of ``event_id``'s queue; returns the number of entries handled"""
+    using = router.db_for_write(EventRegistration)
+    with transaction.atomic(using=using):
+        # Row lock on PostgreSQL; the SQLite backend's BEGIN IMMEDIATE already serializes writers
+        event = Event.objects.using(using).select_for_update().filter(pk=event_id).first()
+        if event is None:
+            return 0
+        active = EventRegistration.objects.using(using).filter(event=event, is_active=True).count()
+        free = None if not event.max_participants else max(event.max_participants - active, 0)
+        # Waitlisted entries are older than queued ones; with no seat left only the queued need a decision
+        waiting = Admission.objects.using(using).filter(
+            event=event, status__in=Admission.WAITING if free != 0 else ['queued'],
+        ).select_related('user').order_by('id')[:get_setting('BATCH_SIZE')]
+        waiting = list(waiting)
+        if not waiting:
+            return 0
+
+        existing = {
+            registration.user_id: registration
+            for registration in EventRegistration.objects.using(using).filter(
+                event=event, user_id__in={entry.user_id for entry in waiting},
+            )
+        }
+        now = timezone.now()
+        admitted, waitlisted, created, reactivated = [], [], [], []
+        for entry in waiting:
+            registration = existing.get(entry.user_id)
+            if registration is None or not registration.is_active:
+                if free == 0:
+                    if entry.status == 'queued':
+                        waitlisted.append(entry)
+                    continue
+                if free is not None:
+                    free -= 1
+                if registration is None:
+                    registration = EventRegistration(user=entry.user, event=event)
+                    created.append(registration)
+                else:
+                    registration.is_active = True
+                    reactivated.append(registration.pk)
+                existing[entry.user_id] = registration
+            entry.status, entry.registration, entry.admitted_at = 'admitted', registration, now
+            admitted.append(entry)
+
+        EventRegistration.objects.using(using).bulk_create(created)
+        if reactivated:
+            reactivated = EventRegistration.objects.using(using).filter(pk__in=reactivated)
+            reactivated.update(is_active=True, updated_at=now)
+            issue_passes(approved(reactivated))
+            transaction.on_commit(seats.feed.wake)
+        for entry in admitted:
+            entry.registration_id = entry.registration.pk
+        Admission.objects.using(using).bulk_update(admitted, ['status', 'registration', 'admitted_at'])
+        Admission.objects.using(using).filter(pk__in=[entry.pk for entry in waitlisted]).update(status='waitlisted')
+        notify_many([entry.user for entry in waitlisted], 'waitlist', {'event': event})
+        # Same side effects as a direct registration: payment, activity, email, pass
+        for registration in created:
+            post_save.send(sender=EventRegistration, instance=registration, created=True,
+                           update_fields=None, raw=False, using=using)
+
+    if len(waiting) == get_setting('BATCH_SIZE'):
+        schedule_admission(event_id, delay=0)
+    return len(waiting)
+
+
+def drain(event_id=None):
+    """Run admission batches until every queue is decided (no worker needed); returns entries handled"""
+    events = [event_id] if event_id is not None else list(
+        Admission.objects.filter(status__in=Admission.WAITING).order_by().values_list('event_id', flat=True).distinct()
+    )
+    handled = 0
+    for pk in events:
+        while True:
+            count = admit(pk)
+            handled += count
+            if count < get_setting('BATCH_SIZE'):
+                break
+    return handled
@@ -0,0 +1,107 @@
+"""
+Async versions of the hot public event reads.
+
+Under an ASGI server these run on the event loop and query through Django's
+async ORM, so a slow client or a lock wait holds a coroutine instead of a
+worker. Other methods on the same URLs (create, update, delete) still go to
+the sync ``EventViewSet``. The output matches the viewset's.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from aiverse_api import sse
+from aiverse_api.batch import not_batchable
+from aiverse_api.routers import replica_reads
+from . import seats
+from .listings import active_event_queryset, fallback_event_queryset, filtered_events, listing
+from .serializers import EventSerializer
+from .views import EventViewSet
+
+READ_METHODS = ('GET', 'HEAD')
+NOT_FOUND = {'detail': 'Not found.'}
+
+
+def _respond(request, data, many=False):
+    serializer = EventSerializer(data, many=many, context={'request': request})
+    return JsonResponse(serializer.data, safe=False)
+
+
+def with_sync_writes(view, actions):
+    """Serve reads with ``view`` and every other method with the viewset"""
+    sync_view = EventViewSet.as_view(actions)
+    write = sync_to_async(sync_view)
+
+    @replica_reads
+    async def dispatch(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await view(request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    dispatch.csrf_exempt = True
+    return dispatch
+
+
+async def event_list(request):
+    """Paginated like DRF's PageNumberPagination"""
+    page_size = api_settings.PAGE_SIZE
+    queryset = filtered_events(request.GET)
+    count = await queryset.acount()
+    last_page = max(1, -(-count // page_size))
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 0
+    if not 1 <= page <= last_page:
+        return JsonResponse({'detail': 'Invalid page.'}, status=404)
+
+    start = (page - 1) * page_size
+    events = [event async for event in queryset[start:start + page_size]]
+    url = request.build_absolute_uri()
+    previous = None
+    if page > 1:
+        previous = remove_query_param(url, 'page') if page == 2 else replace_query_param(url, 'page', page - 1)
+    return JsonResponse({
+        'count': count,
+        'next': replace_query_param(url, 'page', page + 1) if page < last_page else None,
+        'previous': previous,
+        'results': EventSerializer(events, many=True, context={'request': request}).data,
+    })
+
+
+async def event_detail(request, slug):
+    event = await filtered_events({}).filter(slug=slug).afirst()
+    if event is None:
+        return JsonResponse(NOT_FOUND, status=404)
+    return _respond(request, event)
+
+
+def event_listing(name):
+    @replica_reads
+    async def view(request):
+        if request.method not in READ_METHODS:
+            return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        events = [event async for event in listing(name)]
+        return _respond(request, events, many=True)
+    return view
+
+
+@replica_reads
+async def active_event(request):
+    """The event that registrations and payments currently go to"""
+    event = await active_event_queryset().afirst() or await fallback_event_queryset().afirst()
+    if event is None:
+        return JsonResponse({'error': 'No active event found'}, status=404)
+    return _respond(request, event)
+
+
+@not_batchable
+async def event_seats(request, slug):
+    """Server-Sent Events stream of the event's seats remaining (see ``events.seats``)"""
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    subscriber = sse.subscriber_for(request)
+    initial = await sync_to_async(seats.feed.subscribe)(slug, subscriber)
+    if initial is None:
+        return JsonResponse(NOT_FOUND, status=404)
+    return sse.event_stream(subscriber, initial, lambda: seats.feed.unsubscribe(slug, subscriber))
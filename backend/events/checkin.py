@@ -0,0 +1,79 @@
+"""
+Idempotent gate check-ins.
+
+Passes are verified by signature first, so a batch costs three queries no
+matter how many scans it carries: active registrations, existing check-ins
+and one bulk insert.
+"""
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import CheckIn, EventRegistration
+from .passes import verify_pass
+
+
+def _scan_time(value, now):
+    try:
+        scanned_at = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:  # well formed but not a real date, e.g. February 30th
+        scanned_at = None
+    if scanned_at is None:
+        return now
+    if timezone.is_naive(scanned_at):
+        scanned_at = timezone.make_aware(scanned_at)
+    # Scanner clocks drift; never record attendance in the future
+    return min(scanned_at, now)
+
+
+def record_check_ins(event, scans, device=''):
+    """
+    Record ``scans`` (dicts with ``token`` and optional ``scanned_at``) for
+    ``event`` and return one result per scan, in order. Re-sending a scan is
+    harmless: it reports ``already_checked_in`` with the original time.
+    """
+    now = timezone.now()
+    results = []
+    first_scans = {}
+    for scan in scans:
+        token = scan.get('token', '') if isinstance(scan, dict) else ''
+        verified = verify_pass(token)
+        if not verified or verified[0] != event.id:
+            results.append({'token': token, 'status': 'invalid'})
+            continue
+        registration_id = verified[1]
+        scanned_at = _scan_time(scan.get('scanned_at'), now)
+        if registration_id not in first_scans or scanned_at < first_scans[registration_id]:
+            first_scans[registration_id] = scanned_at
+        results.append({'token': token, 'registration': registration_id})
+    
+    if not first_scans:
+        return results
+    
+    active = set(EventRegistration.objects.filter(
+        id__in=first_scans, event=event, is_active=True
+    ).values_list('id', flat=True))
+    existing = dict(CheckIn.objects.filter(
+        registration_id__in=first_scans
+    ).values_list('registration_id', 'scanned_at'))
+    
+    CheckIn.objects.bulk_create(
+        [
+            CheckIn(registration_id=registration_id, event=event, scanned_at=scanned_at, device=device)
+            for registration_id, scanned_at in first_scans.items()
+            if registration_id in active and registration_id not in existing
+        ],
+        ignore_conflicts=True,
+    )
+    
+    for result in results:
+        registration_id = result.get('registration')
+        if registration_id is None:
+            continue
+        if registration_id not in active:
+            result['status'] = 'inactive'
+        elif registration_id in existing:
+            result['status'] = 'already_checked_in'
+            result['checked_in_at'] = timezone.localtime(existing[registration_id]).isoformat()
+        else:
+            result['status'] = 'checked_in'
+            result['checked_in_at'] = timezone.localtime(first_scans[registration_id]).isoformat()
+    return results
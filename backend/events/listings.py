@@ -0,0 +1,42 @@
+"""
+Event queries shared by the sync viewset and the async read views, so both
+return the same events with the same number of queries.
+"""
+from .models import Event
+
+# action -> (status, ordering)
+LISTINGS = {
+    'past': ('completed', '-date'),
+    'upcoming': ('upcoming', 'date'),
+    'current': ('ongoing', 'date'),
+}
+
+
+def events_for_display():
+    """Events with their gallery and active registration count preloaded"""
+    return Event.objects.with_registration_counts().prefetch_related('images')
+
+
+def filtered_events(params):
+    """The list endpoint's ``?status=`` and ``?featured=`` filters"""
+    queryset = events_for_display()
+    status_filter = params.get('status', None)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    if params.get('featured', None):
+        queryset = queryset.filter(is_featured=True)
+    return queryset
+
+
+def listing(name):
+    status, ordering = LISTINGS[name]
+    return events_for_display().filter(status=status).order_by(ordering)
+
+
+def active_event_queryset():
+    """The event registrations and payments are filed under"""
+    return events_for_display().filter(slug='ai-verse-4')
+
+
+def fallback_event_queryset():
+    return events_for_display().filter(status='upcoming')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from events.admissions import drain
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Admit or waitlist every queued registration now (the task workers normally do this)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', help='Slug of one event; all events with a queue by default')
+
+    def handle(self, *args, **options):
+        event_id = None
+        if options['event']:
+            event_id = Event.objects.get(slug=options['event']).pk
+        count = drain(event_id)
+        self.stdout.write(self.style.SUCCESS(f'Decided {count} queued registrations'))
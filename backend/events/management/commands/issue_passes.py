@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from events.models import Event, EventRegistration
+from events.passes import approved, issue_passes
+
+
+class Command(BaseCommand):
+    help = 'Sign entry passes for approved registrations that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', help='Event slug (defaults to all events)')
+
+    def handle(self, *args, **options):
+        registrations = EventRegistration.objects.all()
+        if options['event']:
+            event = Event.objects.filter(slug=options['event']).first()
+            if not event:
+                raise CommandError(f"Event '{options['event']}' not found")
+            registrations = registrations.filter(event=event)
+
+        count = issue_passes(approved(registrations))
+        self.stdout.write(self.style.SUCCESS(f'Issued {count} entry passes'))
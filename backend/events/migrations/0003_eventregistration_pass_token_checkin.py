@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventregistration',
+            name='pass_token',
+            field=models.CharField(blank=True, help_text='Signed entry pass, issued once approved', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='CheckIn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scanned_at', models.DateTimeField(help_text='When the scanner read the pass (may predate upload)')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('device', models.CharField(blank=True, max_length=100)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='check_ins', to='events.event')),
+                ('registration', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='check_in', to='events.eventregistration')),
+            ],
+            options={
+                'verbose_name': 'Check-in',
+                'verbose_name_plural': 'Check-ins',
+                'ordering': ['-scanned_at'],
+            },
+        ),
+    ]
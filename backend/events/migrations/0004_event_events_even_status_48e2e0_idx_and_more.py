@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_eventregistration_pass_token_checkin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['status', '-date'], name='events_even_status_48e2e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['-registered_at'], name='events_even_registe_14fffe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['event', 'is_active'], name='events_even_event_i_238a0d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['event', '-registered_at'], name='events_even_event_i_208d13_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+    EventRegistration.objects.update(updated_at=models.F('registered_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_events_even_status_48e2e0_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventregistration',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['updated_at', 'id'], name='events_even_updated_eccbf0_idx'),
+        ),
+    ]
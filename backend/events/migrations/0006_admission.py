@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0005_eventregistration_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Admission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('waitlisted', 'Waitlisted'), ('admitted', 'Admitted')], default='queued', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('admitted_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='admissions', to='events.event')),
+                ('registration', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='events.eventregistration')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Admission',
+                'verbose_name_plural': 'Admissions',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['event', 'status', 'id'], name='events_admi_event_i_98f05d_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='admission',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'waitlisted'])), fields=('user', 'event'), name='unique_waiting_admission'),
+        ),
+    ]
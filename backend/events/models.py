@@ -1,9 +1,19 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+class EventQuerySet(models.QuerySet):
+    def with_registration_counts(self):
+        """Count active registrations in the same query, for ``total_registrations``"""
+        active = EventRegistration.objects.filter(event=models.OuterRef('pk'), is_active=True).order_by()
+        return self.annotate(active_registration_count=Coalesce(
+            models.Subquery(active.values('event').annotate(n=models.Count('pk')).values('n')), 0
+        ))
+
+
 class Event(models.Model):
     """Event model"""
     EVENT_STATUS_CHOICES = [
@@ -31,8 +41,13 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = EventQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['status', '-date']),
+        ]
         verbose_name = 'Event'
         verbose_name_plural = 'Events'
     
@@ -41,6 +56,8 @@ class Event(models.Model):
     
     @property
     def total_registrations(self):
+        if hasattr(self, 'active_registration_count'):
+            return self.active_registration_count
         return self.eventregistration_set.filter(is_active=True).count()
     
     @property
@@ -70,10 +87,68 @@ class EventRegistration(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     registered_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    pass_token = models.CharField(max_length=64, blank=True, help_text="Signed entry pass, issued once approved")
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['user', 'event']
         ordering = ['-registered_at']
+        indexes = [
+            models.Index(fields=['-registered_at']),
+            models.Index(fields=['event', 'is_active']),
+            models.Index(fields=['event', '-registered_at']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.event.title}"
+
+
+class Admission(models.Model):
+    """A registration request for a capacity-limited event, admitted in order as seats allow"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('waitlisted', 'Waitlisted'),
+        ('admitted', 'Admitted'),
+    ]
+    WAITING = ('queued', 'waitlisted')
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='admissions')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    registration = models.ForeignKey(EventRegistration, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    admitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['event', 'status', 'id']),
+        ]
+        constraints = [
+            # A user waits in an event's queue once, however often they submit
+            models.UniqueConstraint(fields=['user', 'event'], condition=models.Q(status__in=['queued', 'waitlisted']),
+                                    name='unique_waiting_admission'),
+        ]
+        verbose_name = 'Admission'
+        verbose_name_plural = 'Admissions'
+
+    def __str__(self):
+        return f"{self.user.email} - {self.event.title} ({self.status})"
+
+
+class CheckIn(models.Model):
+    """Gate attendance, recorded at most once per registration"""
+    registration = models.OneToOneField(EventRegistration, on_delete=models.CASCADE, related_name='check_in')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='check_ins')
+    scanned_at = models.DateTimeField(help_text="When the scanner read the pass (may predate upload)")
+    received_at = models.DateTimeField(auto_now_add=True)
+    device = models.CharField(max_length=100, blank=True)
+    
+    class Meta:
+        ordering = ['-scanned_at']
+        verbose_name = 'Check-in'
+        verbose_name_plural = 'Check-ins'
+    
+    def __str__(self):
+        return f"{self.registration} @ {self.scanned_at}"
@@ -0,0 +1,77 @@
+"""
+Compact HMAC-signed entry passes.
+
+A pass is ``<event_id>.<registration_id>.<signature>`` where the signature is
+the first 12 bytes of HMAC-SHA256 over ``<event_id>.<registration_id>``,
+base64url encoded without padding. The HMAC key is derived per event, so a
+gate scanner given one event's key (``GET /api/events/{slug}/pass_key/``)
+can verify passes offline but cannot mint passes for other events.
+"""
+import base64
+import hmac
+from hashlib import sha256
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+SIGNATURE_BYTES = 12
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def event_key(event_id):
+    """Per-event HMAC key handed to gate scanners"""
+    secret = getattr(settings, 'ENTRY_PASS_SECRET', None) or settings.SECRET_KEY
+    return salted_hmac('events.passes', str(event_id), secret=secret, algorithm='sha256').digest()
+
+
+def scanner_key(event_id):
+    """``event_key`` encoded for transport to a scanner"""
+    return _b64(event_key(event_id))
+
+
+def _signature(key, event_id, registration_id):
+    message = f'{event_id}.{registration_id}'.encode()
+    return _b64(hmac.new(key, message, sha256).digest()[:SIGNATURE_BYTES])
+
+
+def sign_pass(event_id, registration_id):
+    return f'{event_id}.{registration_id}.{_signature(event_key(event_id), event_id, registration_id)}'
+
+
+def verify_pass(token, key=None):
+    """
+    Return ``(event_id, registration_id)`` for a genuine pass, else None.
+    Needs no database access; pass ``key`` to verify with a scanner's key.
+    """
+    try:
+        event_part, registration_part, signature = token.strip().split('.')
+        event_id, registration_id = int(event_part), int(registration_part)
+    except (AttributeError, ValueError):
+        return None
+    expected = _signature(key or event_key(event_id), event_id, registration_id)
+    # Bytes: compare_digest rejects str with non-ASCII characters
+    if not hmac.compare_digest(expected.encode(), signature.encode()):
+        return None
+    return event_id, registration_id
+
+
+def approved(registrations):
+    """Active registrations that are free or backed by an approved payment"""
+    from payments.models import Payment
+    paid = Payment.objects.filter(user=OuterRef('user'), event=OuterRef('event'), status='approved')
+    return registrations.filter(Q(event__registration_fee__lte=0) | Q(Exists(paid)), is_active=True)
+
+
+def issue_passes(registrations, batch_size=1000):
+    """Sign a pass for every active registration that lacks one, in bulk (callers filter for approval)"""
+    pending = list(registrations.filter(is_active=True, pass_token='').only('id', 'event_id'))
+    now = timezone.now()
+    for registration in pending:
+        registration.pass_token = sign_pass(registration.event_id, registration.id)
+        registration.updated_at = now
+    registrations.model.objects.bulk_update(pending, ['pass_token', 'updated_at'], batch_size=batch_size)
+    return len(pending)
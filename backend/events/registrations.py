@@ -0,0 +1,49 @@
+"""
+Race-free registration.
+
+Double-clicks and retries send the same registration concurrently. On
+PostgreSQL a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` decides
+the winner without an exception or savepoint; elsewhere ``get_or_create``
+recovers from the ``unique_together`` violation. Either way ``post_save``
+(auto-payment, activity, email) fires once, for the request that created it.
+"""
+from django.db import connections, router
+from django.db.models.signals import post_save
+from django.utils import timezone
+from .models import EventRegistration
+
+
+def _insert_on_conflict(user, event, using):
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(EventRegistration._meta.db_table)} "
+            f"({quote('user_id')}, {quote('event_id')}, {quote('registered_at')}, {quote('updated_at')}, "
+            f"{quote('is_active')}, {quote('pass_token')}) "
+            f"VALUES (%s, %s, %s, %s, %s, %s) "
+            f"ON CONFLICT ({quote('user_id')}, {quote('event_id')}) DO NOTHING RETURNING {quote('id')}",
+            [user.pk, event.pk, now, now, True, ''],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    registration = EventRegistration(id=row[0], user=user, event=event, registered_at=now,
+                                     updated_at=now, is_active=True)
+    registration._state.adding = False
+    registration._state.db = using
+    post_save.send(sender=EventRegistration, instance=registration, created=True,
+                   update_fields=None, raw=False, using=using)
+    return registration
+
+
+def register(user, event):
+    """Register ``user`` for ``event`` once; returns ``(registration, created)``"""
+    using = router.db_for_write(EventRegistration)
+    if connections[using].vendor == 'postgresql':
+        registration = _insert_on_conflict(user, event, using)
+        if registration is not None:
+            return registration, True
+        return EventRegistration.objects.using(using).get(user=user, event=event), False
+    return EventRegistration.objects.get_or_create(user=user, event=event)
@@ -0,0 +1,193 @@
+"""
+Live seats remaining per event (Server-Sent Events).
+
+Landing pages subscribe to one event by slug. One producer thread per
+process counts active registrations for every event that has open streams,
+in one query, at most once per ``SEATS_SECONDS`` however many registrations
+arrive in between. It sends a ``seats`` message to an event's streams only
+when the numbers change. A page that connects later gets the cached state
+without touching the database.
+
+Under ASGI, ``with_seat_streams`` serves these streams in front of Django's
+middleware stack. In Django 4.2 that stack gives every request a worker
+thread for as long as the response lasts, so each open stream would hold a
+thread. The Django view in ``async_views`` covers WSGI and ``runserver``.
+"""
+import asyncio
+import io
+import logging
+import re
+import threading
+import time
+from asgiref.sync import sync_to_async
+from corsheaders.middleware import CorsMiddleware
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError, close_old_connections, connections
+from django.http import HttpResponse, JsonResponse
+from aiverse_api.sse import AsyncSubscriber, async_stream, encode, get_setting, with_stream_headers
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+
+def seat_counts(slugs):
+    """``{slug: state}`` for the events that exist"""
+    rows = Event.objects.filter(slug__in=slugs).with_registration_counts().values(
+        'slug', 'max_participants', 'active_registration_count',
+    )
+    states = {}
+    for row in rows:
+        registered = row['active_registration_count']
+        capacity = row['max_participants']
+        states[row['slug']] = {
+            'event': row['slug'],
+            'registered': registered,
+            'max_participants': capacity,
+            'seats_remaining': max(capacity - registered, 0) if capacity else None,
+            'is_full': bool(capacity) and registered >= capacity,
+        }
+    return states
+
+
+class SeatFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._channels = {}
+        self._states = {}
+        self._chunks = {}
+        self._polled_at = 0.0
+        self._thread = None
+
+    def subscribe(self, slug, subscriber):
+        """The chunks to send first, or None if there is no such event"""
+        with self._lock:
+            if slug not in self._chunks:
+                state = seat_counts([slug]).get(slug)
+                if state is None:
+                    return None
+                self._states[slug] = state
+                self._chunks[slug] = encode('seats', state)
+            return self._add(slug, subscriber)
+    
+    def subscribe_cached(self, slug, subscriber):
+        """``subscribe`` without touching the database; None when the event is not cached"""
+        with self._lock:
+            return self._add(slug, subscriber) if slug in self._chunks else None
+    
+    def _add(self, slug, subscriber):
+        self._channels.setdefault(slug, set()).add(subscriber)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='seat-feed', daemon=True)
+            self._thread.start()
+        return [self._chunks[slug]]
+
+    def unsubscribe(self, slug, subscriber):
+        with self._lock:
+            channel = self._channels.get(slug)
+            if channel is None:
+                return
+            channel.discard(subscriber)
+            if not channel:
+                del self._channels[slug]
+                self._states.pop(slug, None)
+                self._chunks.pop(slug, None)
+
+    def wake(self):
+        """Count again soon instead of at the next interval (after a local commit)"""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(get_setting('POLL_SECONDS'))
+            # A burst of registrations inside the interval becomes one update
+            delay = self._polled_at + get_setting('SEATS_SECONDS') - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._wake.clear()
+            with self._lock:
+                if not self._channels:
+                    self._thread = None
+                    break
+                slugs = list(self._channels)
+            try:
+                close_old_connections()
+                states = seat_counts(slugs)
+            except DatabaseError:
+                logger.exception('Seat feed poll failed')
+                continue
+            finally:
+                self._polled_at = time.monotonic()
+            self._publish(states)
+        connections.close_all()
+
+    def _publish(self, states):
+        with self._lock:
+            for slug, state in states.items():
+                channel = self._channels.get(slug)
+                if not channel or state == self._states.get(slug):
+                    continue
+                self._states[slug] = state
+                chunk = self._chunks[slug] = encode('seats', state)
+                for subscriber in list(channel):
+                    subscriber.send(chunk)
+                    if subscriber.closed:
+                        channel.discard(subscriber)
+
+
+feed = SeatFeed()
+
+SEATS_PATH = re.compile(r'^/api/events/(?P<slug>[-a-zA-Z0-9_]+)/seats/$')
+
+
+def _subscribe(slug, subscriber):
+    try:
+        return feed.subscribe(slug, subscriber)
+    finally:
+        connections.close_all()  # a shared executor thread, not a request thread
+
+
+async def _wait_for_disconnect(receive, subscriber):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    subscriber.close()
+
+
+def with_seat_streams(application):
+    """ASGI wrapper answering ``GET /api/events/<slug>/seats/`` itself"""
+    cors = CorsMiddleware(lambda request: None)
+    
+    async def app(scope, receive, send):
+        match = scope['type'] == 'http' and scope['method'] == 'GET' and SEATS_PATH.match(scope['path'])
+        if not match:
+            return await application(scope, receive, send)
+        
+        slug = match['slug']
+        subscriber = AsyncSubscriber(asyncio.get_running_loop())
+        initial = feed.subscribe_cached(slug, subscriber)
+        if initial is None:
+            initial = await sync_to_async(_subscribe, thread_sensitive=False)(slug, subscriber)
+        if initial is None:
+            response = JsonResponse({'detail': 'Not found.'}, status=404)
+        else:
+            response = with_stream_headers(HttpResponse())
+        cors.add_response_headers(ASGIRequest(scope, io.BytesIO()), response)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in response.items()],
+        })
+        if initial is None:
+            return await send({'type': 'http.response.body', 'body': response.content})
+        
+        stream = async_stream(subscriber, initial, lambda: feed.unsubscribe(slug, subscriber))
+        disconnect = asyncio.ensure_future(_wait_for_disconnect(receive, subscriber))
+        try:
+            async for chunk in stream:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnect.cancel()
+            await stream.aclose()
+    
+    return app
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import EventRegistration
+from .passes import issue_passes
+from . import admissions, seats
 from payments.models import Payment
+from notifications.dispatch import notify
 
 @receiver(post_save, sender=EventRegistration)
 def create_payment_for_registration(sender, instance, created, **kwargs):
@@ -18,6 +22,9 @@ def create_payment_for_registration(sender, instance, created, **kwargs):
                     status='pending',
                     notes=f"Auto-created upon registration for {event.title}"
                 )
+        else:
+            # Free events need no approval, so the pass is issued right away
+            issue_passes(EventRegistration.objects.filter(pk=instance.pk))
         
         # Log activity
         from analytics.models import Activity
@@ -26,3 +33,26 @@ def create_payment_for_registration(sender, instance, created, **kwargs):
             action=f"Registered for {event.title}",
             activity_type='registration'
         )
+        
+        # Confirmation email (sent in batches by the task workers)
+        notify(instance.user, 'registration', {'event': event}, coalesce_key=f'registration:{instance.pk}')
+
+
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def wake_seat_feed(sender, instance, **kwargs):
+    # Open seat streams in this process update without waiting for the next poll
+    transaction.on_commit(seats.feed.wake)
+
+
+@receiver(post_save, sender=EventRegistration)
+def promote_waitlist_on_deactivation(sender, instance, created, **kwargs):
+    # A deactivated registration gives its seat to the waitlist
+    if not created and not instance.is_active and instance.event.max_participants:
+        admissions.seats_freed(instance.event_id)
+
+
+@receiver(post_delete, sender=EventRegistration)
+def promote_waitlist_on_delete(sender, instance, **kwargs):
+    if instance.is_active and instance.event.max_participants:
+        admissions.seats_freed(instance.event_id)
@@ -0,0 +1,7 @@
+from taskqueue.queue import task
+from .admissions import admit
+
+
+@task(max_attempts=10)
+def admit_registrations(event_id):
+    admit(event_id)
@@ -1,10 +1,21 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'', views.EventViewSet, basename='events')
 
+# Async reads first; the router keeps serving the other actions
 urlpatterns = [
+    path('', async_views.with_sync_writes(async_views.event_list, {'get': 'list', 'post': 'create'}),
+         name='events-list'),
+    path('past/', async_views.event_listing('past'), name='events-past'),
+    path('upcoming/', async_views.event_listing('upcoming'), name='events-upcoming'),
+    path('current/', async_views.event_listing('current'), name='events-current'),
+    path('active/', async_views.active_event, name='events-active'),
+    path('<slug:slug>/', async_views.with_sync_writes(async_views.event_detail, {
+        'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+    }), name='events-detail'),
+    path('<slug:slug>/seats/', async_views.event_seats, name='events-seats'),
     path('', include(router.urls)),
 ]
@@ -2,10 +2,20 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from django.conf import settings
 from django.db import models
-from .models import Event, EventImage, EventRegistration
+from aiverse_api.ratelimit import RegistrationThrottle, UploadThrottle
+from changes.feed import ChangeFeedMixin
+from idempotency.keys import idempotent
+from .admissions import enqueue, position
+from .checkin import record_check_ins
+from .listings import filtered_events, listing
+from .models import Admission, Event, EventImage, EventRegistration
+from .passes import approved, issue_passes, scanner_key
+from .registrations import register
 from .serializers import EventSerializer, EventImageSerializer, EventRegistrationSerializer
 from users.views import IsAdminUser
+from files.uploads import as_file, claim_upload
 
 
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny
@@ -14,9 +24,13 @@ class EventViewSet(viewsets.ModelViewSet):
     """ViewSet for event management"""
     queryset = Event.objects.all()
     serializer_class = EventSerializer
+    replica_actions = ('list', 'retrieve', 'past', 'upcoming', 'current')
     lookup_field = 'slug'
     
     def get_permissions(self):
+        if self.action in ['check_in', 'pass_key']:
+            # Gate scanners authenticate as admins
+            return [IsAdminUser()]
         if self.action in ['create', 'update', 'partial_update', 'destroy', 'add_image']:
             # For now, keeping it open as per 'NO admin login' requirement 
             # or you might want IsAdminUser if you want SOME security.
@@ -25,58 +39,53 @@ class EventViewSet(viewsets.ModelViewSet):
         return [AllowAny()]
     
     def get_queryset(self):
-        queryset = Event.objects.all()
-        
-        # Filter by status
-        status_filter = self.request.query_params.get('status', None)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        # Filter by featured
-        is_featured = self.request.query_params.get('featured', None)
-        if is_featured:
-            queryset = queryset.filter(is_featured=True)
-        
-        return queryset
+        if self.action in ('list', 'retrieve'):
+            # Filter by status / featured, with counts and images preloaded
+            return filtered_events(self.request.query_params)
+        return Event.objects.all()
     
     @action(detail=False, methods=['get'])
     def past(self, request):
         """Get past events"""
-        events = Event.objects.filter(status='completed').order_by('-date')
-        serializer = self.get_serializer(events, many=True)
+        serializer = self.get_serializer(listing('past'), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
         """Get upcoming events"""
-        events = Event.objects.filter(status='upcoming').order_by('date')
-        serializer = self.get_serializer(events, many=True)
+        serializer = self.get_serializer(listing('upcoming'), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def current(self, request):
         """Get current events"""
-        events = Event.objects.filter(status='ongoing').order_by('date')
-        serializer = self.get_serializer(events, many=True)
+        serializer = self.get_serializer(listing('current'), many=True)
         return Response(serializer.data)
     
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_classes=[UploadThrottle])
     def add_image(self, request, slug=None):
         """Add image to event gallery"""
         event = self.get_object()
         
         image = request.FILES.get('image')
+        upload_id = request.data.get('upload_id')
         caption = request.data.get('caption', '')
         
-        if not image:
+        if upload_id:
+            # Finished chunked upload from /api/uploads/
+            upload = claim_upload(upload_id, 'event_image')
+            with as_file(upload) as image:
+                event_image = EventImage.objects.create(event=event, image=image, caption=caption)
+            upload.delete()
+        elif image:
+            event_image = EventImage.objects.create(
+                event=event,
+                image=image,
+                caption=caption
+            )
+        else:
             return Response({'error': 'No image provided'}, status=status.HTTP_400_BAD_REQUEST)
         
-        event_image = EventImage.objects.create(
-            event=event,
-            image=image,
-            caption=caption
-        )
-        
         serializer = EventImageSerializer(event_image, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
@@ -87,16 +96,41 @@ class EventViewSet(viewsets.ModelViewSet):
         registrations = EventRegistration.objects.filter(event=event)
         serializer = EventRegistrationSerializer(registrations, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def pass_key(self, request, slug=None):
+        """HMAC key that lets a gate scanner verify this event's passes offline"""
+        event = self.get_object()
+        return Response({'event': event.id, 'algorithm': 'HMAC-SHA256/96', 'key': scanner_key(event.id)})
+    
+    @action(detail=True, methods=['post'])
+    def check_in(self, request, slug=None):
+        """Record gate check-ins: a single ``token`` or a ``scans`` batch from an offline scanner"""
+        event = self.get_object()
+        scans = request.data.get('scans')
+        if scans is None:
+            scans = [{'token': request.data.get('token', ''), 'scanned_at': request.data.get('scanned_at')}]
+        if not isinstance(scans, list) or not scans:
+            return Response({'error': 'Provide a token or a list of scans'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(scans) > settings.CHECK_IN_MAX_BATCH:
+            return Response({'error': f'At most {settings.CHECK_IN_MAX_BATCH} scans per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        results = record_check_ins(event, scans, device=str(request.data.get('device', ''))[:100])
+        return Response({'results': results})
 
 
-class EventRegistrationViewSet(viewsets.ModelViewSet):
+class EventRegistrationViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for event registrations"""
     queryset = EventRegistration.objects.all()
     serializer_class = EventRegistrationSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        queryset = EventRegistration.objects.select_related('user', 'event')
+        return EventRegistration.objects.select_related('user', 'event')
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
         
         # Filter by user
         user_id = self.request.query_params.get('user', None)
@@ -107,7 +141,29 @@ class EventRegistrationViewSet(viewsets.ModelViewSet):
         event_slug = self.request.query_params.get('event', None)
         if event_slug:
             queryset = queryset.filter(event__slug=event_slug)
+        
+        return queryset
+    
+    def get_throttles(self):
+        if self.action == 'create':
+            return [RegistrationThrottle()]
+        return super().get_throttles()
+    
+    @action(detail=True, methods=['get'], url_path='pass', permission_classes=[IsAuthenticated])
+    def entry_pass(self, request, pk=None):
+        """Signed entry pass for an approved registration (owner or admin)"""
+        registration = self.get_object()
+        if not (request.user.is_admin or registration.user_id == request.user.id):
+            return Response({'error': 'Not allowed to view this pass'}, status=status.HTTP_403_FORBIDDEN)
+        if not registration.pass_token:
+            issue_passes(approved(EventRegistration.objects.filter(pk=registration.pk)))
+            registration.refresh_from_db(fields=['pass_token'])
+        if not registration.is_active or not registration.pass_token:
+            return Response({'error': 'Registration is not approved yet'}, status=status.HTTP_409_CONFLICT)
+        return Response({'registration': registration.id, 'event': registration.event.slug,
+                         'token': registration.pass_token})
             
+    @idempotent
     def create(self, request, *args, **kwargs):
         # Allow creating user on the fly
         data = request.data.copy()
@@ -148,17 +204,42 @@ class EventRegistrationViewSet(viewsets.ModelViewSet):
         if not event:
              return Response({'error': 'No active event found'}, status=status.HTTP_400_BAD_REQUEST)
              
-        # Check if already registered
-        if EventRegistration.objects.filter(user=user, event=event).exists():
+        if event.max_participants:
+            # Capacity-limited: join the admission queue instead of racing for the last seats.
+            # A deactivated registration (rejected payment) queues again and is reactivated on admission
+            registration = EventRegistration.objects.filter(user=user, event=event, is_active=True).first()
+            if registration is None:
+                return self._queued(enqueue(user, event), status.HTTP_202_ACCEPTED)
+            created = False
+        else:
+            registration, created = register(user, event)
+        if not created:
             # Return existing registration but success status needed for frontend flow
              return Response({
                  'message': 'Already registered', 
-                 'id': EventRegistration.objects.filter(user=user, event=event).first().id,
+                 'id': registration.id,
                  'user_id': user.id, 
                  'event_slug': event.slug
              }, status=status.HTTP_200_OK)
              
-        registration = EventRegistration.objects.create(user=user, event=event)
-        
         serializer = self.get_serializer(registration)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def _queued(self, admission, status_code=status.HTTP_200_OK):
+        return Response({
+            'message': admission.status.capitalize(),
+            'admission_id': admission.id,
+            'status': admission.status,
+            'position': position(admission),
+            'registration': admission.registration_id,
+            'user_id': admission.user_id,
+            'event_slug': admission.event.slug,
+        }, status=status_code)
+
+    @action(detail=False, methods=['get'], url_path=r'queue/(?P<admission_id>[0-9]+)')
+    def queue(self, request, admission_id=None):
+        """Place in the admission queue, or the registration once admitted"""
+        admission = Admission.objects.select_related('event').filter(pk=admission_id).first()
+        if admission is None:
+            return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+        return self._queued(admission)
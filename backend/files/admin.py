@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import UploadSession
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'target', 'offset', 'size', 'created_at', 'completed_at']
+    list_filter = ['target', 'created_at']
+    search_fields = ['filename', 'sha256']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'completed_at']
+    ordering = ['-created_at']
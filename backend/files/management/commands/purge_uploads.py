@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from files.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Delete upload sessions (and their temp files) older than CHUNKED_UPLOAD_EXPIRY'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - settings.CHUNKED_UPLOAD_EXPIRY
+        stale = UploadSession.objects.filter(updated_at__lt=cutoff)
+        count = 0
+        for session in stale.iterator():
+            session.delete()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Purged {count} upload sessions'))
@@ -0,0 +1,45 @@
+import os
+import uuid
+from django.conf import settings
+from django.db import models
+
+
+class UploadSession(models.Model):
+    """Resumable upload written chunk by chunk to a temporary file"""
+    TARGET_CHOICES = [
+        ('event_image', 'Event Image'),
+        ('payment_screenshot', 'Payment Screenshot'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target = models.CharField(max_length=30, choices=TARGET_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField(help_text="Declared total length in bytes")
+    offset = models.BigIntegerField(default=0, help_text="Bytes received so far")
+    sha256 = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Upload Session'
+        verbose_name_plural = 'Upload Sessions'
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+    
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+    
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
+    
+    def delete(self, *args, **kwargs):
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+        return super().delete(*args, **kwargs)
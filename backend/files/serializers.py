@@ -0,0 +1,31 @@
+import os
+from django.conf import settings
+from django.utils.text import get_valid_filename
+from rest_framework import serializers
+from .models import UploadSession
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions"""
+    complete = serializers.BooleanField(source='is_complete', read_only=True)
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'target', 'filename', 'size', 'offset', 'complete', 'sha256',
+                  'created_at', 'updated_at', 'completed_at']
+        read_only_fields = ['id', 'offset', 'sha256', 'created_at', 'updated_at', 'completed_at']
+    
+    def validate_filename(self, value):
+        filename = get_valid_filename(os.path.basename(value))
+        if not filename:
+            raise serializers.ValidationError("Invalid filename")
+        return filename
+    
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Size must be positive")
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Uploads are limited to {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes"
+            )
+        return value
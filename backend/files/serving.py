@@ -0,0 +1,194 @@
+"""
+Conditional, range-aware delivery of files stored under MEDIA_ROOT.
+
+When a front proxy is configured (``MEDIA_ACCEL_REDIRECT``) the response only
+carries a handoff header and the proxy streams the bytes, so the worker is
+released as soon as the permission and freshness checks are done.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+# Uploads under these prefixes are never served by the public media view
+PROTECTED_PREFIXES = ('payment_screenshots/',)
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+SIGNING_SALT = 'files.media'
+
+
+def normalize_name(name):
+    """Collapse a requested path into a storage name relative to MEDIA_ROOT"""
+    return posixpath.normpath(name).lstrip('/')
+
+
+def media_path(name):
+    """Resolve a storage name to an existing file inside MEDIA_ROOT"""
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    if not os.path.isfile(path):
+        raise Http404('File not found')
+    return path
+
+
+def file_etag(stat):
+    """Strong ETag derived from mtime and size, identical across workers"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    Parse a single ``bytes=`` range into inclusive ``(start, end)`` offsets.
+
+    Returns None when the header should be ignored (malformed or multi-range)
+    and raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError('Unsatisfiable range')
+    return start, min(end, size - 1)
+
+
+def if_range_passes(request, etag, last_modified):
+    """A Range is only honoured if If-Range (when sent) still matches the file"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+class RangeFileWrapper:
+    """Iterate over ``length`` bytes of a file starting at ``start``"""
+
+    def __init__(self, filelike, start, length, chunk_size=CHUNK_SIZE):
+        self.filelike = filelike
+        self.filelike.seek(start)
+        self.remaining = length
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.filelike.read(min(self.chunk_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.filelike.close()
+
+
+def _file_response(request, name, path, stat, etag, last_modified):
+    content_type, encoding = mimetypes.guess_type(path)
+    content_type = content_type or 'application/octet-stream'
+    accel = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+
+    if accel == 'nginx':
+        # nginx serves the internal location itself, including Range requests
+        response = HttpResponse(content_type=content_type)
+        prefix = settings.MEDIA_ACCEL_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = quote(f'{prefix}/{name}')
+        return response
+    if accel == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and if_range_passes(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    if byte_range is None:
+        # FileResponse lets the WSGI server use wsgi.file_wrapper / sendfile
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            RangeFileWrapper(open(path, 'rb'), start, length),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+
+    response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def serve_file(request, name, private=False):
+    """
+    Serve ``name`` from MEDIA_ROOT honouring If-None-Match, If-Modified-Since
+    and Range. Private files are marked uncacheable by shared caches.
+    """
+    path = media_path(name)
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _file_response(request, name, path, stat, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    max_age = settings.MEDIA_CACHE_MAX_AGE
+    if private:
+        patch_cache_control(response, private=True, max_age=max_age)
+    else:
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def sign_media(name):
+    """Return a time-limited token granting read access to one protected file"""
+    signed = signing.TimestampSigner(salt=SIGNING_SALT).sign(name)
+    return signed[len(name) + 1:]
+
+
+def check_media_signature(name, token):
+    """Validate a token produced by ``sign_media`` for the same file"""
+    if not token:
+        return False
+    try:
+        value = signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            f'{name}:{token}', max_age=settings.MEDIA_SIGNED_URL_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return value == name
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import UploadViewSet
+
+router = DefaultRouter()
+router.register(r'', UploadViewSet, basename='uploads')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
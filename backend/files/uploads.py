@@ -0,0 +1,185 @@
+"""
+Offset-based resumable upload protocol (a subset of tus 1.0).
+
+Each PATCH streams its body straight into the session's temp file in small
+blocks, so memory per upload stays at one block regardless of file size.
+"""
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.utils import timezone
+from rest_framework import serializers
+from .models import UploadSession
+
+try:
+    import fcntl
+except ImportError:  # Windows: PATCHes are serialized within the process only
+    fcntl = None
+
+BLOCK_SIZE = 64 * 1024
+MAX_CACHED_HASHERS = 256
+
+# Running whole-file digests for sessions this process has written to,
+# keyed by session id and stored with the offset they cover
+_hashers = OrderedDict()
+_local_lock = threading.Lock()
+
+
+class UploadConflict(Exception):
+    """The client's offset does not match the bytes stored on the server"""
+
+
+class CompletedUpload(File):
+    """A finished upload that storage can move into place instead of copying"""
+    
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def start_upload(target, filename, size):
+    session = UploadSession.objects.create(target=target, filename=filename, size=size)
+    os.makedirs(os.path.dirname(session.temp_path), exist_ok=True)
+    open(session.temp_path, 'wb').close()
+    return session
+
+
+def _hasher_for(session):
+    cached = _hashers.get(session.pk)
+    if cached and cached[0] == session.offset:
+        _hashers.move_to_end(session.pk)
+        return cached[1]
+    
+    # Another worker wrote the previous chunk: rebuild the digest from disk
+    hasher = hashlib.sha256()
+    remaining = session.offset
+    with open(session.temp_path, 'rb') as f:
+        while remaining > 0:
+            data = f.read(min(BLOCK_SIZE, remaining))
+            if not data:
+                break
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def _remember_hasher(session, hasher):
+    _hashers[session.pk] = (session.offset, hasher)
+    _hashers.move_to_end(session.pk)
+    while len(_hashers) > MAX_CACHED_HASHERS:
+        _hashers.popitem(last=False)
+
+
+def parse_checksum(header):
+    """Parse a tus ``Upload-Checksum: sha256 <base64>`` header"""
+    if not header:
+        return None
+    algorithm, _, value = header.partition(' ')
+    if algorithm.lower() != 'sha256':
+        raise serializers.ValidationError({'checksum': 'Only sha256 checksums are supported'})
+    try:
+        return base64.b64decode(value.strip(), validate=True)
+    except ValueError:
+        raise serializers.ValidationError({'checksum': 'Checksum is not valid base64'})
+
+
+@contextmanager
+def _writer_lock(f):
+    """Exclusive hold on the session file, or UploadConflict if another PATCH has it"""
+    if fcntl is None:
+        with _local_lock:
+            yield
+        return
+    try:
+        # flock, unlike lockf, also excludes other threads of this process
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise UploadConflict()
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def append_chunk(session, stream, offset, length, checksum=None):
+    """
+    Append ``length`` bytes read from ``stream`` at ``offset``.
+    
+    If the client disconnects mid-chunk the bytes that did arrive are kept
+    (unless a checksum was supplied), so the next attempt resumes from there.
+    A PATCH holds a lock on the session file from the offset check until the
+    new offset is saved, so a concurrent PATCH gets a conflict without
+    touching the file.
+    """
+    if offset != session.offset:
+        raise UploadConflict()
+    if session.is_complete:
+        raise serializers.ValidationError({'offset': 'Upload is already complete'})
+    if offset + length > session.size:
+        raise serializers.ValidationError({'length': 'Chunk exceeds the declared upload size'})
+    
+    with open(session.temp_path, 'r+b') as f, _writer_lock(f):
+        # The session may have moved on while this request was reading it
+        stored = UploadSession.objects.filter(pk=session.pk).values_list('offset', 'completed_at').first()
+        if stored is None or stored != (offset, None):
+            raise UploadConflict()
+        
+        hasher = _hasher_for(session).copy()
+        chunk_hasher = hashlib.sha256()
+        written = 0
+        f.seek(offset)
+        # Drop bytes left over from an earlier, abandoned attempt
+        f.truncate()
+        while written < length:
+            try:
+                data = stream.read(min(BLOCK_SIZE, length - written))
+            except OSError:
+                break
+            if not data:
+                break
+            f.write(data)
+            hasher.update(data)
+            chunk_hasher.update(data)
+            written += len(data)
+        f.flush()
+        
+        if checksum is not None and (written != length or chunk_hasher.digest() != checksum):
+            raise serializers.ValidationError({'checksum': 'Chunk checksum mismatch'})
+        
+        now = timezone.now()
+        new_offset = offset + written
+        updated = UploadSession.objects.filter(pk=session.pk, offset=offset).update(
+            offset=new_offset, updated_at=now
+        )
+        if not updated:
+            raise UploadConflict()
+        
+        session.offset = new_offset
+        session.updated_at = now
+        if new_offset == session.size:
+            session.sha256 = hasher.hexdigest()
+            session.completed_at = now
+            session.save(update_fields=['sha256', 'completed_at'])
+            _hashers.pop(session.pk, None)
+        else:
+            _remember_hasher(session, hasher)
+    return session
+
+
+def claim_upload(upload_id, target):
+    """Return the finished session for ``upload_id`` or raise a ValidationError"""
+    try:
+        session = UploadSession.objects.get(pk=upload_id, target=target)
+    except (UploadSession.DoesNotExist, DjangoValidationError):
+        raise serializers.ValidationError({'upload_id': 'Unknown upload'})
+    if not session.is_complete:
+        raise serializers.ValidationError({'upload_id': 'Upload is not complete'})
+    return session
+
+
+def as_file(session):
+    return CompletedUpload(open(session.temp_path, 'rb'), name=session.filename)
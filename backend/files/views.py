@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.views.decorators.http import require_safe
+from rest_framework import status, viewsets
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from aiverse_api.ratelimit import UploadChunkThrottle, UploadThrottle
+from .models import UploadSession
+from .serializers import UploadSessionSerializer
+from .serving import PROTECTED_PREFIXES, normalize_name, serve_file
+from .uploads import UploadConflict, append_chunk, parse_checksum, start_upload
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve public uploads (gallery, event and profile images)"""
+    name = normalize_name(path)
+    if name.startswith(PROTECTED_PREFIXES):
+        raise Http404('File not found')
+    return serve_file(request, name)
+
+
+class UploadViewSet(viewsets.ViewSet):
+    """
+    Resumable uploads: POST to start, PATCH raw chunks with an
+    ``Upload-Offset`` header, HEAD/GET to find where to resume.
+    """
+    permission_classes = [AllowAny]
+    lookup_value_regex = '[0-9a-f-]{36}'
+    
+    def _get_session(self, pk):
+        try:
+            return UploadSession.objects.get(pk=pk)
+        except (UploadSession.DoesNotExist, ValidationError):
+            raise Http404('Upload not found')
+    
+    def get_throttles(self):
+        if self.action == 'create':
+            return [UploadThrottle()]
+        if self.action == 'partial_update':
+            return [UploadChunkThrottle()]
+        return super().get_throttles()
+    
+    def _respond(self, session, status_code=status.HTTP_200_OK):
+        response = Response(UploadSessionSerializer(session).data, status=status_code)
+        response['Upload-Offset'] = str(session.offset)
+        response['Upload-Length'] = str(session.size)
+        response['Cache-Control'] = 'no-store'
+        return response
+    
+    def create(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = start_upload(**serializer.validated_data)
+        
+        response = self._respond(session, status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(f'{session.id}/')
+        response['Upload-Chunk-Size'] = str(settings.CHUNKED_UPLOAD_CHUNK_SIZE)
+        return response
+    
+    def retrieve(self, request, pk=None):
+        return self._respond(self._get_session(pk))
+    
+    def partial_update(self, request, pk=None):
+        """Append one chunk; the request body is the raw bytes"""
+        session = self._get_session(pk)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset and Content-Length headers are required'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+            return Response({'error': f'Chunks are limited to {settings.CHUNKED_UPLOAD_CHUNK_SIZE} bytes'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        
+        checksum = parse_checksum(request.headers.get('Upload-Checksum'))
+        try:
+            append_chunk(session, request.stream, offset, length, checksum)
+        except UploadConflict:
+            session.refresh_from_db()
+            return self._respond(session, status.HTTP_409_CONFLICT)
+        return self._respond(session)
+    
+    def destroy(self, request, pk=None):
+        self._get_session(pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import IdempotencyKey
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ['digest', 'status_code', 'created_at', 'expires_at']
+    list_filter = ['status_code']
+    readonly_fields = ['digest', 'fingerprint', 'status_code', 'headers', 'body', 'created_at', 'expires_at']
+    ordering = ['-created_at']
@@ -0,0 +1,174 @@
+"""
+``Idempotency-Key`` support for write endpoints.
+
+A client that times out on a registration or payment cannot tell whether
+the server got the request, so it sends it again, and the user ends up
+registered or charged twice. With ``@idempotent`` on a view method, a
+request carrying an ``Idempotency-Key`` header claims that key, runs the
+view once and stores the response. Any retry with the same key, endpoint
+and caller gets the stored response back, marked ``Idempotent-Replayed:
+true``, and the view does not run again.
+
+The claim is a row that is unique on a hash of the key, the path and the
+caller: the user, or for anonymous requests the submitted email, so two
+anonymous clients reusing a key never see each other's response. An
+anonymous request without an email is not stored at all. A duplicate that arrives while the first request is still running
+finds that row without a response. It polls until the first request
+finishes and then replays the stored response. If it waits ``WAIT_SECONDS``
+without a result it gets ``409`` with ``Retry-After``.
+A claim older than ``LOCK_SECONDS`` belongs to a request that died before
+it finished; the next retry takes it over.
+
+Responses are kept for ``TTL_SECONDS`` as compact JSON. Server errors, and
+exceptions raised by the view, are not stored; the claim is released so a
+retry runs the view again. Reusing a key with a different body gets
+``422``. ``manage.py compact_idempotency_keys`` deletes expired rows.
+"""
+import functools
+import itertools
+import json
+import time
+from datetime import timedelta
+from hashlib import blake2b
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from .models import IdempotencyKey
+
+DEFAULTS = {
+    'TTL_SECONDS': 24 * 60 * 60,    # how long retries get the stored response
+    'WAIT_SECONDS': 15,             # how long a duplicate waits for the request it repeats
+    'LOCK_SECONDS': 60,             # claims older than this are abandoned; longer than any request
+}
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+POLL_INTERVALS = (0.05, 0.1, 0.2, 0.5)     # seconds between checks while waiting, the last repeats
+REPLAYED_HEADERS = ('Location',)
+ANONYMOUS_FIELD = 'email'       # body field that tells anonymous callers apart
+
+
+def get_setting(key):
+    return getattr(settings, 'IDEMPOTENCY', {}).get(key, DEFAULTS[key])
+
+
+def _hash(*parts):
+    return blake2b('\n'.join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _file(value):
+    # Uploads are compared by name and size; their bytes may not be read twice
+    if isinstance(value, File):
+        return f'{value.name}:{value.size}'
+    return str(value)
+
+
+def fingerprint(request):
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = {key: values for key, values in data.lists()}
+    return _hash(json.dumps(data, sort_keys=True, default=_file))
+
+
+def _replay(record):
+    response = Response(json.loads(record.body) if record.body else None, status=record.status_code)
+    for name, value in record.headers.items():
+        response[name] = value
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _claim(digest, request_fingerprint):
+    """``(row, created)``: a new claim, or the row another request already holds for the key"""
+    now = timezone.now()
+    while True:
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    digest=digest, fingerprint=request_fingerprint,
+                    expires_at=now + timedelta(seconds=get_setting('TTL_SECONDS')),
+                ), True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(digest=digest).first()
+        if record is None:
+            continue  # released between the insert and the read
+        stale = record.status_code is None and record.created_at < now - timedelta(seconds=get_setting('LOCK_SECONDS'))
+        if record.expires_at > now and not stale:
+            return record, False
+        # Expired, or abandoned by a request that died: whoever deletes it claims next
+        IdempotencyKey.objects.filter(pk=record.pk, status_code=record.status_code).delete()
+
+
+def _wait(record):
+    """``record`` once it has a response, None if it was released, or still in flight at the deadline"""
+    deadline = time.monotonic() + get_setting('WAIT_SECONDS')
+    for attempt in itertools.count():
+        if record is None or record.status_code is not None or time.monotonic() >= deadline:
+            return record
+        time.sleep(POLL_INTERVALS[min(attempt, len(POLL_INTERVALS) - 1)])
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+
+
+def _caller(request):
+    """Who a stored response belongs to; None for an anonymous request that names no one"""
+    if request.user.is_authenticated:
+        return str(request.user.pk)
+    value = request.data.get(ANONYMOUS_FIELD) if hasattr(request.data, 'get') else None
+    if isinstance(value, str) and value.strip():
+        return f'email:{value.strip().lower()}'
+    return None
+
+
+def idempotent(view_method):
+    """Run a viewset method once per ``Idempotency-Key``; retries replay its response"""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        caller = _caller(request)
+        if caller is None:
+            return view_method(self, request, *args, **kwargs)
+        digest = _hash(key, request.method, request.path, caller)
+        request_fingerprint = fingerprint(request)
+        while True:
+            record, created = _claim(digest, request_fingerprint)
+            if created:
+                break
+            if record.fingerprint != request_fingerprint:
+                return Response({'error': 'Idempotency-Key was already used for a different request'},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            record = _wait(record)
+            if record is None:
+                continue  # the first request failed; run this one instead
+            if record.status_code is None:
+                response = Response({'error': 'A request with this Idempotency-Key is still in progress'},
+                                    status=status.HTTP_409_CONFLICT)
+                response['Retry-After'] = '1'
+                return response
+            return _replay(record)
+
+        claim = IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True)
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except BaseException:
+            claim.delete()
+            raise
+        if response.status_code >= 500 or response.streaming or not isinstance(response, Response):
+            claim.delete()
+            return response
+        claim.update(
+            status_code=response.status_code,
+            headers={name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)},
+            body=json.dumps(response.data, cls=JSONEncoder, separators=(',', ':')) if response.data is not None else '',
+        )
+        return response
+    return wrapper
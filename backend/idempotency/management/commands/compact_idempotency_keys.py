@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from idempotency.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses past IDEMPOTENCY TTL_SECONDS'
+
+    def handle(self, *args, **options):
+        count, _ = IdempotencyKey.objects.filter(expires_at__lt=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'Compacted {count} idempotency keys'))
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """The first response to a write sent with an ``Idempotency-Key``, replayed to its retries"""
+    digest = models.CharField(max_length=32, unique=True, help_text="Hash of the key, endpoint and caller")
+    fingerprint = models.CharField(max_length=32, help_text="Hash of the request body")
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Empty while the first request runs")
+    headers = models.JSONField(default=dict, blank=True)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        verbose_name = 'Idempotency key'
+        verbose_name_plural = 'Idempotency keys'
+    
+    def __str__(self):
+        return f"{self.digest} ({self.status_code or 'in flight'})"
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        from . import metrics
+        from .instrumentation import get_setting, instrument_phases
+        if get_setting('ENABLED'):
+            instrument_phases()
+        if metrics.get_setting('ENABLED'):
+            from . import collectors  # noqa: F401 (registers scrape-time gauges)
+            metrics.instrument_caches()
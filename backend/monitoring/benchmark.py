@@ -0,0 +1,150 @@
+"""
+In-process endpoint benchmarks.
+
+Each scenario is driven through ``django.test.Client`` against a throwaway
+test database seeded with a configurable amount of data, measuring latency
+percentiles, queries per request and peak allocations per request.
+"""
+import statistics
+import tracemalloc
+from time import perf_counter
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from changes.feed import encode_cursor
+from events.models import Event
+from payments.models import Payment
+from . import datagen
+
+User = get_user_model()
+
+PASSWORD = 'benchmark-password'
+
+
+def rate_limits_disabled():
+    """Settings override for harnesses that replay many requests from one address"""
+    return override_settings(RATE_LIMITS={**getattr(settings, 'RATE_LIMITS', {}), 'ENABLED': False})
+
+
+def seed(users):
+    """Generate a dataset scaled to ``users`` plus an admin to drive the admin routes"""
+    datagen.generate(users=users, activities=users * 10, registrations=users // 2, events=4)
+    admin = User.objects.create_user(email='bench-admin@example.com', username='bench-admin',
+                                     full_name='Benchmark Admin', password=PASSWORD, is_admin=True)
+    return admin, Event.objects.get(slug=datagen.UPCOMING_SLUG)
+
+
+class Scenario:
+    def __init__(self, name, method, path, data=None, admin=False, iterations=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.admin = admin
+        self.iterations = iterations
+    
+    def request(self, client, i, headers):
+        path = self.path(i) if callable(self.path) else self.path
+        data = self.data(i) if callable(self.data) else self.data
+        kwargs = headers if self.admin else {}
+        if self.method == 'get':
+            return client.get(path, **kwargs)
+        return client.post(path, data or {}, content_type='application/json', **kwargs)
+
+
+def build_scenarios(upcoming, users):
+    pending = list(Payment.objects.filter(status='pending').values_list('id', flat=True))
+    slug = upcoming.slug
+    since = encode_cursor(timezone.now() - timedelta(minutes=1))
+    return [
+        Scenario('events-list', 'get', '/api/events/'),
+        Scenario('events-detail', 'get', f'/api/events/{slug}/'),
+        Scenario('events-upcoming', 'get', '/api/events/upcoming/'),
+        Scenario('events-past', 'get', '/api/events/past/'),
+        Scenario('events-current', 'get', '/api/events/current/'),
+        Scenario('event-registrations', 'get', f'/api/events/{slug}/registrations/'),
+        Scenario('registrations-create', 'post', '/api/registrations/',
+                 lambda i: {'email': f'walkin{i}@example.com', 'fullName': f'Walk-in {i}'}),
+        Scenario('payments-list', 'get', '/api/payments/', admin=True),
+        Scenario('payments-changes', 'get', f'/api/payments/?since={since}', admin=True),
+        Scenario('payments-create', 'post', '/api/payments/',
+                 lambda i: {'email': f'user{i % users}@{datagen.EMAIL_DOMAIN}', 'amount': '499.00', 'transaction_id': f'BENCH{i}'}),
+        Scenario('payments-approve', 'post', lambda i: f'/api/payments/{pending[i % len(pending)]}/approve/',
+                 admin=True),
+        Scenario('users-list', 'get', '/api/users/', admin=True),
+        Scenario('users-changes', 'get', f'/api/users/?since={since}', admin=True),
+        Scenario('registrations-changes', 'get', f'/api/registrations/?since={since}', admin=True),
+        Scenario('dashboard', 'get', '/api/analytics/', admin=True),
+        Scenario('auth-profile', 'get', '/api/auth/profile/', admin=True),
+        # PBKDF2 makes every login deliberately slow; a few samples are enough
+        Scenario('auth-login', 'post', '/api/auth/login/',
+                 {'email': 'bench-admin@example.com', 'password': PASSWORD}, iterations=5),
+    ]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run(scenarios, admin, iterations, warmup=3):
+    client = Client()
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(admin).access_token}'}
+    results = {}
+    counter = 0
+    for scenario in scenarios:
+        count = min(iterations, scenario.iterations or iterations)
+        for _ in range(min(warmup, count)):
+            scenario.request(client, counter, headers)
+            counter += 1
+        
+        timings = []
+        queries = []
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as captured:
+                start = perf_counter()
+                response = scenario.request(client, counter, headers)
+                timings.append((perf_counter() - start) * 1000)
+            queries.append(len(captured.captured_queries))
+            counter += 1
+            if response.status_code >= 400:
+                raise RuntimeError(f'{scenario.name} returned {response.status_code}: {response.content[:200]!r}')
+        
+        # Allocation pass kept separate: tracemalloc distorts timings
+        tracemalloc.start()
+        scenario.request(client, counter, headers)
+        counter += 1
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        results[scenario.name] = {
+            'iterations': count,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'queries': max(queries),
+            'alloc_kb': round(peak / 1024, 1),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance, noise_ms=1.0):
+    """Return human-readable regressions of ``results`` against ``baseline``"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current['queries'] > base['queries']:
+            regressions.append(f"{name}: queries {base['queries']} -> {current['queries']}")
+        limit = base['p95_ms'] * (1 + tolerance)
+        if current['p95_ms'] > limit and current['p95_ms'] - base['p95_ms'] > noise_ms:
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['alloc_kb'] > base['alloc_kb'] * (1 + tolerance):
+            regressions.append(f"{name}: allocations {base['alloc_kb']}KB -> {current['alloc_kb']}KB")
+    return regressions
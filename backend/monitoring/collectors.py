@@ -0,0 +1,22 @@
+"""Gauges read from the database when /metrics is scraped"""
+from django.db.models import Count
+from events.models import EventRegistration
+from notifications.models import Notification
+from payments.models import Payment
+from taskqueue.models import Task
+from .metrics import collector
+
+
+@collector
+def business_metrics():
+    payments = dict(Payment.objects.values_list('status').annotate(n=Count('id')))
+    return [
+        ('aiverse_payments', 'gauge', 'Payments by status; pending is the approval backlog.',
+         [({'status': status}, payments.get(status, 0)) for status, _ in Payment.STATUS_CHOICES]),
+        ('aiverse_registrations', 'gauge', 'Event registrations; deleted rows lower it, so use deriv() for the rate.',
+         [({}, EventRegistration.objects.count())]),
+        ('aiverse_tasks_pending', 'gauge', 'Background tasks waiting for a worker.',
+         [({}, Task.objects.filter(status='pending').count())]),
+        ('aiverse_notifications_queued', 'gauge', 'Notification emails waiting to be sent.',
+         [({}, Notification.objects.filter(status='queued').count())]),
+    ]
@@ -0,0 +1,222 @@
+"""
+Deterministic synthetic data for load and scale testing.
+
+The same seed on the same database gives the same rows and values.
+Timestamps are placed relative to when the generator runs, so the upcoming
+festival stays upcoming, and they differ between runs. A run on top of an
+earlier one without ``--flush`` numbers its users and events after the
+existing ones.
+
+Rows are written with ``bulk_create`` in batches, so model signals (payment
+auto-creation, activity logging, notification emails) never fire; the
+generator writes those side effects itself with plausible timestamps.
+"""
+import math
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from analytics.models import Activity
+from events.models import CheckIn, Event, EventRegistration
+from notifications.models import Notification
+from payments.models import Payment
+
+User = get_user_model()
+
+EMAIL_DOMAIN = 'synthetic.aiverse.test'
+SLUG_PREFIX = 'synthetic-'
+UPCOMING_SLUG = 'ai-verse-4'
+PASSWORD = 'synthetic-password'
+
+COLLEGES = [
+    'Government Engineering College', 'National Institute of Technology', 'City College of Engineering',
+    'Institute of Science and Technology', 'State University', 'Women\'s Engineering College',
+]
+DEPARTMENTS = ['CSE', 'IT', 'ECE', 'EEE', 'AI & DS', 'Mechanical', 'Civil']
+YEARS = ['1st Year', '2nd Year', '3rd Year', '4th Year']
+FEES = [Decimal('0.00'), Decimal('150.00'), Decimal('200.00'), Decimal('300.00'), Decimal('499.00')]
+
+# Outcome mixes: (approved, rejected) shares, the rest stays pending
+PAST_PAYMENT_MIX = (0.86, 0.08)
+UPCOMING_PAYMENT_MIX = (0.55, 0.05)
+# Share of activity rows per type
+ACTIVITY_MIX = [('login', 0.55), ('event', 0.2), ('registration', 0.1), ('payment', 0.1), ('other', 0.05)]
+ACTIVITY_ACTIONS = {
+    'login': 'User logged in',
+    'event': 'Viewed event page',
+    'registration': 'Registered for an event',
+    'payment': 'Initiated payment',
+    'other': 'Updated profile',
+}
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let ``bulk_create`` keep the given ``auto_now``/``auto_now_add`` values"""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def spread(rng, start, end, mode=None):
+    """A datetime between ``start`` and ``end``, clustered around ``mode`` if given"""
+    span = (end - start).total_seconds()
+    peak = span if mode is None else (mode - start).total_seconds()
+    offset = rng.triangular(0, span, peak) if mode is not None else rng.uniform(0, span)
+    return start + timedelta(seconds=offset)
+
+
+def flush():
+    """Delete everything a previous run generated"""
+    users = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')
+    events = Event.objects.filter(slug__startswith=SLUG_PREFIX)
+    Activity.objects.filter(user__in=users).delete()
+    Notification.objects.filter(user__in=users).delete()
+    CheckIn.objects.filter(event__in=events).delete()
+    Payment.objects.filter(user__in=users).delete()
+    EventRegistration.objects.filter(user__in=users).delete()
+    users.delete()
+    events.delete()
+
+
+def generate(users=100_000, activities=1_000_000, registrations=50_000, events=12,
+             seed=0, batch_size=5000, log=None):
+    """
+    Generate ``users`` attendees, ``events`` past events plus the upcoming
+    festival, ``registrations`` registrations with payments for paid events,
+    and ``activities`` activity rows. Returns the row counts written.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    now = timezone.now()
+    history_start = now - timedelta(days=365 * 3)
+    counts = {}
+
+    with transaction.atomic():
+        # Past events every couple of months, plus the upcoming one the site sells
+        event_rows = []
+        # Numbered after a previous run's events, like the users below
+        first_event = Event.objects.filter(slug__startswith=SLUG_PREFIX).count()
+        for n in range(first_event, first_event + events):
+            date = now - timedelta(days=30 + (first_event + events - n) * 75 + rng.randint(0, 20))
+            event_rows.append(Event(
+                title=f'Synthetic Event {n + 1}', slug=f'{SLUG_PREFIX}{n + 1}',
+                description='Generated for load testing', short_description='Generated event',
+                date=date, end_date=date + timedelta(hours=8), venue=rng.choice(['Main Auditorium', 'Seminar Hall', 'Open Air Theatre']),
+                registration_fee=rng.choice(FEES), status='completed', gallery_dir=f'synthetic{n + 1}',
+            ))
+        upcoming = Event.objects.filter(slug=UPCOMING_SLUG).first()
+        if upcoming is None:
+            event_rows.append(Event(
+                title='AI Verse 4.0', slug=UPCOMING_SLUG, description='The upcoming festival',
+                date=now + timedelta(days=60), venue='CSE Department Auditorium',
+                registration_fee=Decimal('1499.00'), max_participants=500, status='upcoming',
+                is_featured=True, gallery_dir='aiverse4',
+            ))
+        Event.objects.bulk_create(event_rows)
+        all_events = list(Event.objects.filter(slug__startswith=SLUG_PREFIX).order_by('date'))
+        all_events.append(Event.objects.get(slug=UPCOMING_SLUG))
+        counts['events'] = len(event_rows)
+        log(f'{len(event_rows)} events')
+
+        # Sign-ups ramp up over time, so later dates are more likely
+        password = make_password(PASSWORD)
+        first = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').count()
+        user_field = User._meta.get_field
+        with explicit_timestamps(user_field('created_at'), user_field('updated_at')):
+            def user_rows():
+                for i in range(first, first + users):
+                    joined = spread(rng, history_start, now, mode=now)
+                    yield User(
+                        email=f'user{i}@{EMAIL_DOMAIN}', username=f'synthetic{i}', full_name=f'Synthetic User {i}',
+                        password=password, phone=f'9{rng.randint(100000000, 999999999)}',
+                        college=rng.choice(COLLEGES), department=rng.choice(DEPARTMENTS),
+                        year_of_study=rng.choice(YEARS), date_joined=joined, created_at=joined, updated_at=joined,
+                    )
+            for batch in batched(user_rows(), batch_size):
+                User.objects.bulk_create(batch)
+        user_rows = list(
+            User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').order_by('id').values_list('id', 'created_at')
+        )[first:]
+        counts['users'] = len(user_rows)
+        log(f'{len(user_rows)} users')
+
+        # Larger, later events draw more registrations
+        weights = [1 + i for i in range(len(all_events))]
+        shares = [round(registrations * w / sum(weights)) for w in weights]
+        registration_field = EventRegistration._meta.get_field
+        payment_field = Payment._meta.get_field
+        registration_total = payment_total = 0
+        with explicit_timestamps(registration_field('registered_at'), registration_field('updated_at'),
+                                 payment_field('submitted_at'), payment_field('updated_at')):
+            for event, share in zip(all_events, shares):
+                opens = event.date - timedelta(days=60)
+                closes = min(event.date, now)
+                attendees = rng.sample(user_rows, min(share, len(user_rows)))
+                approved_share, rejected_share = UPCOMING_PAYMENT_MIX if event.date > now else PAST_PAYMENT_MIX
+                paid = event.registration_fee > 0
+                regs, payments = [], []
+                for user_id, joined in attendees:
+                    registered = spread(rng, max(opens, joined), max(closes, joined), mode=closes)
+                    outcome = rng.random()
+                    status = 'approved' if outcome < approved_share else 'rejected' if outcome < approved_share + rejected_share else 'pending'
+                    regs.append(EventRegistration(
+                        user_id=user_id, event=event, registered_at=registered, updated_at=registered,
+                        is_active=not paid or status != 'rejected',
+                    ))
+                    if paid:
+                        submitted = registered + timedelta(minutes=rng.randint(1, 180))
+                        processed = submitted + timedelta(hours=rng.uniform(1, 72)) if status != 'pending' else None
+                        processed = processed and min(processed, now)
+                        payments.append(Payment(
+                            user_id=user_id, event=event, amount=event.registration_fee,
+                            transaction_id=f'SYN{seed}X{user_id}X{event.pk}', status=status,
+                            submitted_at=submitted, processed_at=processed, updated_at=processed or submitted,
+                        ))
+                EventRegistration.objects.bulk_create(regs, batch_size=batch_size)
+                Payment.objects.bulk_create(payments, batch_size=batch_size)
+                registration_total += len(regs)
+                payment_total += len(payments)
+        counts['registrations'] = registration_total
+        counts['payments'] = payment_total
+
+        # Capped events never hold more active registrations than seats
+        # (events.admissions): size the festival's cap from what it drew,
+        # leaving about a fifth of the seats still on sale
+        festival = all_events[-1]
+        active = EventRegistration.objects.filter(event=festival, is_active=True).count()
+        seats = max(500, math.ceil(active * 1.25 / 100) * 100)
+        if seats > (festival.max_participants or 0):
+            Event.objects.filter(pk=festival.pk).update(max_participants=seats)
+        log(f'{registration_total} registrations, {payment_total} payments')
+
+        types = [kind for kind, _ in ACTIVITY_MIX]
+        type_weights = [share for _, share in ACTIVITY_MIX]
+        with explicit_timestamps(Activity._meta.get_field('timestamp')):
+            def activity_rows():
+                for kind in rng.choices(types, type_weights, k=activities):
+                    user_id, joined = rng.choice(user_rows)
+                    yield Activity(user_id=user_id, action=ACTIVITY_ACTIONS[kind], activity_type=kind,
+                                   timestamp=spread(rng, joined, now, mode=now))
+            for batch in batched(activity_rows(), batch_size):
+                Activity.objects.bulk_create(batch)
+        counts['activities'] = activities
+        log(f'{activities} activities')
+
+    return counts
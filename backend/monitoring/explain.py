@@ -0,0 +1,102 @@
+"""
+Query plan checks for the hot endpoints.
+
+Each distinct SELECT an endpoint runs is explained, and the plan is flagged
+when it reads a large table without an index or sorts one in a temporary
+B-tree. SQLite uses ``EXPLAIN QUERY PLAN``; PostgreSQL uses ``EXPLAIN
+(FORMAT JSON)`` with sequential scans and sorts disabled, so a remaining
+``Seq Scan`` or ``Sort`` means no index can serve the query at any size.
+"""
+import json
+import re
+from django.contrib.auth import get_user_model
+from analytics.models import Activity
+from events.models import EventRegistration
+from payments.models import Payment
+from .instrumentation import normalize_sql
+
+LARGE_MODELS = [get_user_model(), Activity, Payment, EventRegistration]
+
+SQLITE_SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+# Walking a whole (non-covering) index only to order rows, while the WHERE
+# clause filters on something else, reads the entire table as well
+SQLITE_INDEX_SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)? USING INDEX')
+SQLITE_TEMP_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)')
+
+
+def large_tables():
+    return {model._meta.db_table for model in LARGE_MODELS}
+
+
+def _sqlite_problems(cursor, sql, tables):
+    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+    details = [row[3] for row in cursor.fetchall()]
+    touched = {table for table in tables if any(table in detail for detail in details)}
+    problems = []
+    for detail in details:
+        scan = SQLITE_SCAN_RE.match(detail)
+        if scan and scan.group(1) in tables:
+            problems.append(f'full scan of {scan.group(1)}')
+        index_scan = SQLITE_INDEX_SCAN_RE.match(detail)
+        if index_scan and index_scan.group(1) in tables and ' WHERE ' in sql and ' LIMIT ' not in sql:
+            problems.append(f'full index scan of {index_scan.group(1)} with an unindexed filter')
+        sort = SQLITE_TEMP_SORT_RE.search(detail)
+        if sort and touched:
+            problems.append(f"temp B-tree for {sort.group(1)} over {', '.join(sorted(touched))}")
+    return details, problems
+
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _walk(child)
+
+
+def _postgresql_problems(cursor, sql, tables):
+    cursor.execute('SET LOCAL enable_seqscan = off')
+    cursor.execute('SET LOCAL enable_sort = off')
+    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = list(_walk(plan[0]['Plan']))
+    details = [f"{node['Node Type']} {node.get('Relation Name', '')}".strip() for node in nodes]
+    problems = []
+    for node in nodes:
+        relation = node.get('Relation Name')
+        if node['Node Type'] == 'Seq Scan' and relation in tables:
+            problems.append(f'full scan of {relation}')
+        if node['Node Type'] in ('Sort', 'Incremental Sort'):
+            sorted_tables = {child.get('Relation Name') for child in _walk(node)} & tables
+            if sorted_tables:
+                problems.append(f"sort over {', '.join(sorted(sorted_tables))}")
+    return details, problems
+
+
+def explain(connection, sql):
+    """Return (plan lines, problems) for one captured SELECT"""
+    tables = large_tables()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            return _postgresql_problems(cursor, sql, tables)
+        if connection.vendor == 'sqlite':
+            return _sqlite_problems(cursor, sql, tables)
+    raise NotImplementedError(f'No plan check for {connection.vendor}')
+
+
+def audit(connection, captured):
+    """
+    Explain each distinct SELECT in ``captured`` (CaptureQueriesContext
+    entries); returns ``[(sql, plan lines, problems)]``.
+    """
+    seen = set()
+    results = []
+    for query in captured:
+        sql = query['sql']
+        shape = normalize_sql(sql)
+        if not sql.lstrip().upper().startswith('SELECT') or shape in seen:
+            continue
+        seen.add(shape)
+        details, problems = explain(connection, sql)
+        results.append((shape, details, problems))
+    return results
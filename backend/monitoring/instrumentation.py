@@ -0,0 +1,149 @@
+"""
+Per-request timing of database queries, serialization, rendering and
+model signals.
+
+The statistics for the request being handled live in a context variable,
+so the hooks below cost a ``ContextVar.get()`` when nothing is recording.
+Stack inspection and SQL normalization only happen for slow queries.
+"""
+import json
+import logging
+import re
+import traceback
+from contextvars import ContextVar
+from time import perf_counter
+from django.conf import settings
+
+logger = logging.getLogger('monitoring.sql')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_QUERY_MS': 100,
+}
+
+current_stats = ContextVar('request_stats', default=None)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN \((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+LIBRARY_PATHS = ('/site-packages/', '/django/', '/rest_framework/', '/monitoring/')
+
+
+def get_setting(key):
+    return getattr(settings, 'PERFORMANCE', {}).get(key, DEFAULTS[key])
+
+
+class RequestStats:
+    """Counters for one request; times are in seconds"""
+    __slots__ = ('queries', 'db_time', 'serialize_time', 'render_time', 'signal_time', 'total_time', '_depth')
+    
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.signal_time = 0.0
+        self.total_time = 0.0
+        self._depth = {}
+    
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'signals;dur={self.signal_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+def normalize_sql(sql):
+    """Strip literals so identical query shapes group together in logs"""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def query_origin():
+    """
+    The innermost stack frame in project code, falling back to the innermost
+    frame outside Django's database layer (e.g. DRF pagination)
+    """
+    base_dir = str(settings.BASE_DIR).replace('\\', '/')
+    fallback = None
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = frame.filename.replace('\\', '/')
+        if '/monitoring/' in filename or '/django/db/' in filename:
+            continue
+        if fallback is None:
+            fallback = frame
+        if filename.startswith(base_dir) and not any(part in filename for part in LIBRARY_PATHS):
+            fallback = frame
+            break
+    if fallback is None:
+        return 'unknown'
+    return f'{fallback.filename}:{fallback.lineno} in {fallback.name}'
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` hook that counts and times every query"""
+    
+    def __init__(self, stats, alias):
+        self.stats = stats
+        self.alias = alias
+        self.slow_threshold = get_setting('SLOW_QUERY_MS') / 1000
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            self.stats.queries += 1
+            self.stats.db_time += duration
+            if duration >= self.slow_threshold:
+                logger.warning(json.dumps({
+                    'event': 'slow_query',
+                    'database': self.alias,
+                    'duration_ms': round(duration * 1000, 1),
+                    'sql': normalize_sql(sql),
+                    'origin': query_origin(),
+                }))
+
+
+def _timed(fget, attr):
+    """Wrap a callable so time spent in it is added to ``attr`` (outermost call only)"""
+    def wrapper(*args, **kwargs):
+        stats = current_stats.get()
+        if stats is None or stats._depth.get(attr):
+            return fget(*args, **kwargs)
+        stats._depth[attr] = True
+        start = perf_counter()
+        try:
+            return fget(*args, **kwargs)
+        finally:
+            setattr(stats, attr, getattr(stats, attr) + perf_counter() - start)
+            stats._depth[attr] = False
+    wrapper.__wrapped__ = fget
+    return wrapper
+
+
+def instrument_phases():
+    """Patch DRF serialization/rendering and model signal dispatch once"""
+    from django.db.models import signals
+    from rest_framework import serializers
+    from rest_framework.response import Response
+    
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not hasattr(cls.data.fget, '__wrapped__'):
+            cls.data = property(_timed(cls.data.fget, 'serialize_time'))
+    if not hasattr(Response.rendered_content.fget, '__wrapped__'):
+        Response.rendered_content = property(_timed(Response.rendered_content.fget, 'render_time'))
+    # Only write-path signals; pre_init/post_init fire for every fetched row
+    for signal in (signals.pre_save, signals.post_save, signals.pre_delete,
+                   signals.post_delete, signals.m2m_changed):
+        if not hasattr(signal.send, '__wrapped__'):
+            signal.send = _timed(signal.send, 'signal_time')
@@ -0,0 +1,57 @@
+import json
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from monitoring import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the API in-process against a seeded throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Seeded attendees (with registrations and payments)')
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per scenario')
+        parser.add_argument('--only', nargs='*', help='Run only these scenarios')
+        parser.add_argument('--save', metavar='PATH', help='Write the results as the new baseline')
+        parser.add_argument('--compare', metavar='PATH', help='Fail if results regress against this baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative increase in p95 latency and allocations (default 0.25)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # Every request comes from one address
+        limits = benchmark.rate_limits_disabled()
+        limits.enable()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            admin, upcoming = benchmark.seed(options['users'])
+            scenarios = benchmark.build_scenarios(upcoming, options['users'])
+            if options['only']:
+                scenarios = [s for s in scenarios if s.name in options['only']]
+            results = benchmark.run(scenarios, admin, options['iterations'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            limits.disable()
+
+        self.stdout.write(f"{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'alloc KB':>11}")
+        for name, row in results.items():
+            self.stdout.write(f"{name:<24}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['queries']:>9}{row['alloc_kb']:>11}")
+
+        if options['save']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['save'])), exist_ok=True)
+            with open(options['save'], 'w') as f:
+                json.dump({'users': options['users'], 'results': results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['save']}"))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            if baseline.get('users') != options['users']:
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline was recorded with --users {baseline.get('users')}; comparing anyway"
+                ))
+            regressions = benchmark.compare(results, baseline['results'], options['tolerance'])
+            if regressions:
+                raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from monitoring import serverbench
+
+DEFAULT_PATHS = ['/api/events/', '/api/events/upcoming/', '/api/events/past/', '/api/events/active/']
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent-connection capacity of gunicorn (WSGI) and uvicorn (ASGI) serving the event reads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='*', choices=list(serverbench.SERVERS), default=list(serverbench.SERVERS))
+        parser.add_argument('--workers', type=int, default=2, help='Server worker processes')
+        parser.add_argument('--concurrency', type=int, nargs='*', default=[10, 50, 200], help='Open connections per run')
+        parser.add_argument('--slow-clients', type=int, nargs='*', default=[0, 4], help='Slow-sending connections per run')
+        parser.add_argument('--duration', type=float, default=5, help='Seconds per run')
+        parser.add_argument('--timeout', type=float, default=5, help='Seconds before a request counts as an error')
+        parser.add_argument('--paths', nargs='*', default=DEFAULT_PATHS)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Serving {settings.DATABASES['default']['NAME']} with {options['workers']} workers; "
+            f"seed it with generate_data for realistic payloads"
+        )
+        self.stdout.write(f"{'server':<7}{'conns':>7}{'slow':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}")
+        for kind in options['servers']:
+            process, port = serverbench.start_server(kind, options['workers'], settings.BASE_DIR)
+            try:
+                serverbench.measure(port, options['paths'], 4, 0, 1)  # warm up every worker
+                for slow in options['slow_clients']:
+                    for concurrency in options['concurrency']:
+                        row = serverbench.measure(port, options['paths'], concurrency, slow, options['duration'], options['timeout'])
+                        self.stdout.write(
+                            f"{kind:<7}{concurrency:>7}{slow:>6}{row['rps']:>9}{row['p50_ms'] or '-':>9}"
+                            f"{row['p95_ms'] or '-':>9}{row['errors']:>8}"
+                        )
+            finally:
+                serverbench.stop_server(process)
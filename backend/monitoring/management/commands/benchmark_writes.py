@@ -0,0 +1,37 @@
+import logging
+import os
+import tempfile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from monitoring import writebench
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent SQLite write throughput: plain connection vs the tuned backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['thread', 'process', 'both'], default='both')
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--operations', type=int, default=200, help='Read-then-write transactions per worker')
+
+    def handle(self, *args, **options):
+        tuned = (connection.settings_dict['ENGINE'], connection.settings_dict['OPTIONS'])
+        if not tuned[0].startswith('aiverse_api.sqlite'):
+            tuned = ('aiverse_api.sqlite', {})
+            self.stdout.write(self.style.WARNING('Default database is not the tuned SQLite backend; using its defaults'))
+        modes = ['thread', 'process'] if options['mode'] == 'both' else [options['mode']]
+
+        self.stdout.write(f"{'mode':<9}{'backend':<9}{'ops/s':>9}{'ok':>7}{'failed':>8}{'write wait ms':>15}")
+        # Lock errors are the point of the "plain" run; don't log each one
+        logging.disable(logging.CRITICAL)
+        try:
+            for mode in modes:
+                for label, (engine, db_options) in (('plain', writebench.PLAIN), ('tuned', tuned)):
+                    with tempfile.TemporaryDirectory() as directory:
+                        name = os.path.join(directory, 'writes.sqlite3')
+                        row = writebench.run(engine, name, db_options, mode, options['workers'], options['operations'])
+                    self.stdout.write(
+                        f"{mode:<9}{label:<9}{row['ops_per_second']:>9}{row['ops']:>7}{row['failed']:>8}{row['write_wait_ms']:>15}"
+                    )
+        finally:
+            logging.disable(logging.NOTSET)
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from rest_framework_simplejwt.tokens import RefreshToken
+from monitoring import benchmark, explain
+
+
+class Command(BaseCommand):
+    help = 'Explain the queries of the hot endpoints and fail on full scans or temp B-tree sorts of large tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000, help='Size of the seeded dataset')
+        parser.add_argument('--only', nargs='*', help='Check only these benchmark scenarios')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # Every request comes from one address
+        limits = benchmark.rate_limits_disabled()
+        limits.enable()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        failures = []
+        try:
+            admin, upcoming = benchmark.seed(options['users'])
+            headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(admin).access_token}'}
+            client = Client()
+            for i, scenario in enumerate(benchmark.build_scenarios(upcoming, options['users'])):
+                if options['only'] and scenario.name not in options['only']:
+                    continue
+                with CaptureQueriesContext(connection) as captured:
+                    scenario.request(client, i, headers)
+                # SET LOCAL on PostgreSQL needs a transaction; rolled back afterwards
+                with transaction.atomic():
+                    results = explain.audit(connection, captured.captured_queries)
+                    transaction.set_rollback(True)
+
+                bad = [row for row in results if row[2]]
+                style = self.style.ERROR if bad else self.style.SUCCESS
+                self.stdout.write(style(f'{scenario.name}: {len(results)} distinct selects, {len(bad)} flagged'))
+                for sql, details, problems in bad:
+                    self.stdout.write(f"  {'; '.join(problems)}\n    {sql[:300]}")
+                    if options['verbosity'] > 1:
+                        self.stdout.write('    plan: ' + ' | '.join(details))
+                    failures.append(f"{scenario.name}: {'; '.join(problems)}")
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            limits.disable()
+
+        if failures:
+            raise CommandError(f'{len(failures)} queries read large tables without an index:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All hot-endpoint queries use indexes'))
@@ -0,0 +1,32 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from monitoring import datagen
+
+
+class Command(BaseCommand):
+    help = 'Generate a large deterministic synthetic dataset for load and scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--activities', type=int, default=1_000_000)
+        parser.add_argument('--registrations', type=int, default=50_000)
+        parser.add_argument('--events', type=int, default=12, help='Past events to spread registrations over')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same rows (timestamps are relative to now)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true', help='Delete previously generated data first')
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        if options['flush']:
+            datagen.flush()
+            self.stdout.write('Removed previously generated data')
+        counts = datagen.generate(
+            users=options['users'], activities=options['activities'],
+            registrations=options['registrations'], events=options['events'],
+            seed=options['seed'], batch_size=options['batch_size'],
+            log=lambda message: self.stdout.write(f'  {message} ({perf_counter() - start:.1f}s)'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {counts['users']} users, {counts['registrations']} registrations, "
+            f"{counts['payments']} payments and {counts['activities']} activities in {perf_counter() - start:.1f}s"
+        ))
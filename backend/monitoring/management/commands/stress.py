@@ -0,0 +1,72 @@
+import json
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from monitoring import benchmark, datagen, stress
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent duplicate registrations, payments and approvals and check the invariants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['thread', 'process', 'both'], default='both')
+        parser.add_argument('--flows', nargs='*', choices=stress.FLOWS, default=list(stress.FLOWS))
+        parser.add_argument('--users', type=int, default=50, help='Distinct users per flow')
+        parser.add_argument('--duplicates', type=int, default=4, help='Identical requests fired together per user')
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        # Processes cannot share an in-memory SQLite database
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            test_settings['NAME'] = os.path.join(settings.BASE_DIR, 'stress_test.sqlite3')
+
+        modes = ['thread', 'process'] if options['mode'] == 'both' else [options['mode']]
+        setup_test_environment()
+        # Every request comes from one address
+        limits = benchmark.rate_limits_disabled()
+        limits.enable()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        report, failures = {}, []
+        try:
+            datagen.generate(users=0, activities=0, registrations=0, events=0)
+            for mode in modes:
+                approval_ids = stress.seed(mode, options['users'])
+                jobs = stress.build_jobs(mode, options['flows'], options['users'], options['duplicates'], approval_ids)
+                results, elapsed = stress.run(mode, jobs, options['workers'],
+                                             connection.settings_dict['NAME'], quiet=options['verbosity'] < 2)
+                report[mode] = stress.summarize(results, elapsed)
+                report[mode]['violations'] = [
+                    f'{flow}: {summary["statuses"][code]} requests answered {code}'
+                    for flow, summary in report[mode].items() if flow in stress.FLOWS
+                    for code in summary['statuses'] if code >= 500
+                ] + stress.check_invariants(mode, options['flows'], options['users'])
+                failures += [f'[{mode}] {failure}' for failure in report[mode]['violations']]
+        finally:
+            database_name = connection.settings_dict['NAME']
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            limits.disable()
+            # Pool threads keep their connections open, leaving WAL files behind
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(f'{database_name}{suffix}'):
+                    os.remove(f'{database_name}{suffix}')
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for mode, summary in report.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{mode}: {summary['throughput_rps']} req/s"))
+                for flow in stress.FLOWS:
+                    if flow in summary:
+                        row = summary[flow]
+                        self.stdout.write(
+                            f"  {flow:<14} {row['requests']:>5} req  p50 {row['p50_ms']}ms  p95 {row['p95_ms']}ms  "
+                            f"write wait {row['write_wait_ms']}ms  lock errors {row['lock_errors']}  statuses {row['statuses']}"
+                        )
+        if failures:
+            raise CommandError('Invariant violations:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All invariants held'))
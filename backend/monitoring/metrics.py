@@ -0,0 +1,303 @@
+"""
+Prometheus metrics shared across worker processes without a broker.
+
+Every process appends its counters and histogram buckets to its own
+memory-mapped file in METRICS['DIR'] (one writer per file, so no locking
+between processes). ``/metrics`` sums the files of all processes, live or
+exited, which is how counters stay monotonic across worker restarts. Each
+scrape first folds the files of exited processes into one archive file and
+deletes them, so restarts do not leave a file per PID behind.
+Wipe the directory when the server (not a single worker) starts.
+"""
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: os.kill cannot probe a PID, files are kept
+    fcntl = None
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIR': None,
+    'AUTH_TOKEN': None,
+    'PUBLIC': False,
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+INITIAL_SIZE = 64 * 1024
+ARCHIVE = 'metrics_archive.db'
+PROCESS_FILE = re.compile(r'metrics_(\d+)\.db$')
+HEADER = struct.Struct('<I4x')   # bytes used, padding
+KEY_LENGTH = struct.Struct('<I')
+VALUE = struct.Struct('<d')
+
+
+def get_setting(key):
+    return getattr(settings, 'METRICS', {}).get(key, DEFAULTS[key])
+
+
+def metrics_dir():
+    path = get_setting('DIR') or os.path.join(settings.BASE_DIR, 'metrics_data')
+    os.makedirs(path, exist_ok=True)
+    return str(path)
+
+
+class MmapedDict:
+    """Append-only ``str -> float64`` map stored in a memory-mapped file"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size < INITIAL_SIZE:
+            self._file.truncate(INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = HEADER.unpack_from(self._map, 0)[0] or HEADER.size
+        self._positions = {key: position for key, _, position in self._entries(self._map, self._used)}
+    
+    @staticmethod
+    def _entries(data, used):
+        offset = HEADER.size
+        while offset < used:
+            length = KEY_LENGTH.unpack_from(data, offset)[0]
+            key = bytes(data[offset + 4:offset + 4 + length]).decode()
+            offset += 4 + length + (-(4 + length) % 8)
+            yield key, VALUE.unpack_from(data, offset)[0], offset
+            offset += VALUE.size
+    
+    @classmethod
+    def read_file(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            return
+        used = HEADER.unpack_from(data, 0)[0]
+        for key, value, _ in cls._entries(data, used):
+            yield key, value
+    
+    def _append(self, key):
+        encoded = key.encode()
+        entry_size = 4 + len(encoded) + (-(4 + len(encoded)) % 8) + VALUE.size
+        while self._used + entry_size > len(self._map):
+            new_size = len(self._map) * 2
+            self._map.close()
+            self._file.truncate(new_size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        KEY_LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + 4:self._used + 4 + len(encoded)] = encoded
+        position = self._used + entry_size - VALUE.size
+        VALUE.pack_into(self._map, position, 0.0)
+        self._used += entry_size
+        # Publish the entry only once it is fully written
+        HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+    
+    def increment(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        VALUE.pack_into(self._map, position, VALUE.unpack_from(self._map, position)[0] + amount)
+    
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class _ProcessStore:
+    """Opens this process's file lazily, and again after a fork"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._dict = None
+    
+    def increment(self, key, amount):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._dict = MmapedDict(os.path.join(metrics_dir(), f'metrics_{self._pid}.db'))
+            self._dict.increment(key, amount)
+
+
+store = _ProcessStore()
+registry = []
+collectors = []
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Counter:
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        registry.append(self)
+    
+    def inc(self, amount=1, **labels):
+        store.increment(_key(self.name, labels), amount)
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        registry.append(self)
+    
+    def observe(self, value, **labels):
+        # Buckets are stored non-cumulatively and summed up on export
+        bound = next((b for b in self.buckets if value <= b), '+Inf')
+        store.increment(_key(f'{self.name}_bucket', {**labels, 'le': str(bound)}), 1)
+        store.increment(_key(f'{self.name}_sum', labels), value)
+        store.increment(_key(f'{self.name}_count', labels), 1)
+
+
+def collector(func):
+    """Register ``func() -> [(name, type, help, [(labels, value), ...])]`` evaluated per scrape"""
+    collectors.append(func)
+    return func
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def archive_dead_processes(directory):
+    """Fold the files of exited processes into the archive file and delete them"""
+    if fcntl is None:
+        return
+    with open(os.path.join(directory, '.archive.lock'), 'a') as lock:
+        # One scraper at a time, or two would add the same file to the archive
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = None
+        try:
+            for path in glob.glob(os.path.join(directory, 'metrics_*.db')):
+                match = PROCESS_FILE.search(path)
+                if not match or _is_alive(int(match.group(1))):
+                    continue
+                if archive is None:
+                    archive = MmapedDict(os.path.join(directory, ARCHIVE))
+                try:
+                    values = list(MmapedDict.read_file(path))
+                except (OSError, struct.error, UnicodeDecodeError):
+                    values = []
+                for key, value in values:
+                    archive.increment(key, value)
+                os.remove(path)
+        finally:
+            if archive is not None:
+                archive.close()
+
+
+def render():
+    """Aggregate every process file plus scrape-time collectors into text format 0.0.4"""
+    directory = metrics_dir()
+    archive_dead_processes(directory)
+    totals = {}
+    for path in glob.glob(os.path.join(directory, 'metrics_*.db')):
+        try:
+            for key, value in MmapedDict.read_file(path):
+                totals[key] = totals.get(key, 0.0) + value
+        except (OSError, struct.error, UnicodeDecodeError):
+            continue
+    
+    samples = {}
+    for key, value in totals.items():
+        name, labels = json.loads(key)
+        samples.setdefault(name, []).append((tuple(tuple(item) for item in labels), value))
+    
+    lines = []
+    for metric in registry:
+        if isinstance(metric, Histogram):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} histogram')
+            buckets = {}
+            for labels, value in samples.get(f'{metric.name}_bucket', []):
+                series = tuple(item for item in labels if item[0] != 'le')
+                le = dict(labels)['le']
+                buckets.setdefault(series, {})[le] = value
+            for series, counts in sorted(buckets.items()):
+                cumulative = 0
+                for bound in [str(b) for b in metric.buckets] + ['+Inf']:
+                    cumulative += counts.get(bound, 0)
+                    lines.append(f'{metric.name}_bucket{_format_labels(series + (("le", bound),))} {_format_value(cumulative)}')
+                for suffix in ('_sum', '_count'):
+                    value = dict(samples.get(f'{metric.name}{suffix}', [])).get(series, 0)
+                    lines.append(f'{metric.name}{suffix}{_format_labels(series)} {_format_value(value)}')
+        else:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} counter')
+            for labels, value in sorted(samples.get(metric.name, [])):
+                lines.append(f'{metric.name}{_format_labels(labels)} {_format_value(value)}')
+    
+    for func in collectors:
+        for name, kind, documentation, values in func():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in values:
+                lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+http_requests = Counter('http_requests_total', 'HTTP requests by view, method and status code.')
+http_latency = Histogram('http_request_duration_seconds', 'Request latency by view and method.')
+db_queries = Histogram('db_queries_per_request', 'Database queries issued per request, by view.', QUERY_BUCKETS)
+cache_requests = Counter('cache_requests_total', 'Cache lookups by cache alias and result (hit/miss).')
+
+
+def instrument_caches():
+    """Count hits and misses on every configured cache backend class"""
+    from django.core.cache import caches
+    
+    missing = object()
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if hasattr(backend.get, '__wrapped__'):
+            continue
+        
+        def get(self, key, default=None, version=None, _original=backend.get):
+            value = _original(self, key, missing, version)
+            cache_requests.inc(cache=getattr(self, '_metrics_alias', 'default'),
+                               result='miss' if value is missing else 'hit')
+            return default if value is missing else value
+        get.__wrapped__ = backend.get
+        backend.get = get
+    
+    # Backends are created per thread; label each with its alias as it is built
+    if not hasattr(caches.create_connection, '__wrapped__'):
+        def create_connection(alias, _original=caches.create_connection):
+            backend = _original(alias)
+            backend._metrics_alias = alias
+            return backend
+        create_connection.__wrapped__ = caches.create_connection
+        caches.create_connection = create_connection
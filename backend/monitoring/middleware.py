@@ -0,0 +1,184 @@
+import json
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from .instrumentation import QueryRecorder, RequestStats, current_stats, get_setting
+from . import metrics, profiling
+
+logger = logging.getLogger('monitoring.requests')
+
+
+class PerformanceMiddleware:
+    """
+    Time each request, add a ``Server-Timing`` header and log slow requests.
+    Disabled entirely (no per-request cost) when PERFORMANCE['ENABLED'] is False.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.server_timing = get_setting('SERVER_TIMING')
+        self.slow_request = get_setting('SLOW_REQUEST_MS') / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def _recording(self, stats):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(QueryRecorder(stats, connection.alias)))
+        return stack
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        request.perf_stats = stats
+        token = current_stats.set(stats)
+        start = perf_counter()
+        try:
+            with self._recording(stats):
+                response = self.get_response(request)
+        finally:
+            stats.total_time = perf_counter() - start
+            current_stats.reset(token)
+        return self._finish(request, response, stats)
+    
+    async def __acall__(self, request):
+        stats = RequestStats()
+        request.perf_stats = stats
+        token = current_stats.set(stats)
+        start = perf_counter()
+        # Queries run on the request's thread-sensitive worker thread (sync
+        # views and the async ORM alike), so the recorder is installed there
+        recording = await sync_to_async(self._recording)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.close)()
+            stats.total_time = perf_counter() - start
+            current_stats.reset(token)
+        return self._finish(request, response, stats)
+    
+    def _finish(self, request, response, stats):
+        if self.server_timing:
+            response['Server-Timing'] = stats.server_timing()
+        if stats.total_time >= self.slow_request:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'duration_ms': round(stats.total_time * 1000, 1),
+                'queries': stats.queries,
+                'db_ms': round(stats.db_time * 1000, 1),
+                'serialize_ms': round(stats.serialize_time * 1000, 1),
+                'render_ms': round(stats.render_time * 1000, 1),
+                'signals_ms': round(stats.signal_time * 1000, 1),
+            }))
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record request count, latency and query count per resolved view name
+    (``payments-approve``, ``events-upcoming``...), so every viewset action
+    is covered without touching the views. Place it after PerformanceMiddleware.
+    """
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not metrics.get_setting('ENABLED'):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = perf_counter()
+        response = self.get_response(request)
+        return self._record(request, response, perf_counter() - start)
+    
+    async def __acall__(self, request):
+        start = perf_counter()
+        response = await self.get_response(request)
+        return self._record(request, response, perf_counter() - start)
+    
+    def _record(self, request, response, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        metrics.http_requests.inc(view=view, method=request.method, status=str(response.status_code))
+        metrics.http_latency.observe(duration, view=view, method=request.method)
+        stats = getattr(request, 'perf_stats', None)
+        if stats is not None:
+            metrics.db_queries.observe(stats.queries, view=view)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when an admin passes ``?__profile=cpu|sql|mem|all``.
+    JWT authentication normally runs inside DRF views, so the token is
+    checked here; anyone else gets the normal, unprofiled response.
+    Under ASGI a profiled request is driven from a worker thread; sync views
+    and async ORM calls run on that thread and are captured, code running on
+    the event loop itself is not.
+    """
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not profiling.get_setting('ENABLED'):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def _admin(self, request):
+        from rest_framework.exceptions import AuthenticationFailed
+        from users.authentication import CachedJWTAuthentication
+        from rest_framework_simplejwt.exceptions import InvalidToken
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except (AuthenticationFailed, InvalidToken):
+            return None
+        user = result[0] if result else None
+        return user if user and user.is_active and user.is_admin else None
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        modes = profiling.requested_modes(request)
+        user = self._admin(request) if modes else None
+        if not user:
+            return self.get_response(request)
+        
+        with profiling.Capture(modes) as capture:
+            response = self.get_response(request)
+        response['X-Profile-Id'] = capture.save(request, response, user)
+        return response
+    
+    async def __acall__(self, request):
+        modes = profiling.requested_modes(request)
+        user = await sync_to_async(self._admin)(request) if modes else None
+        if not user:
+            return await self.get_response(request)
+        return await sync_to_async(self._profile)(request, modes, user)
+    
+    def _profile(self, request, modes, user):
+        with profiling.Capture(modes) as capture:
+            response = async_to_sync(self.get_response)(request)
+        response['X-Profile-Id'] = capture.save(request, response, user)
+        return response
@@ -0,0 +1,198 @@
+"""
+On-demand profiling of a single request.
+
+An admin adds ``?__profile=cpu`` (or ``sql``, ``mem``, ``all``, comma
+separated) to any request; the response carries ``X-Profile-Id`` and the
+capture is stored in PROFILING['DIR'], which keeps only the newest
+PROFILING['MAX_CAPTURES'] captures.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import secrets
+import threading
+import tracemalloc
+from time import perf_counter
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from .instrumentation import normalize_sql, query_origin
+
+DEFAULTS = {
+    'ENABLED': False,
+    'DIR': None,
+    'MAX_CAPTURES': 50,
+    'TOP_FUNCTIONS': 40,
+}
+MODES = {'cpu', 'sql', 'mem'}
+
+# tracemalloc is process-wide, so only one request traces allocations at a time
+_tracemalloc_lock = threading.Lock()
+
+
+def get_setting(key):
+    return getattr(settings, 'PROFILING', {}).get(key, DEFAULTS[key])
+
+
+def profiles_dir():
+    path = get_setting('DIR') or os.path.join(settings.BASE_DIR, 'profiles')
+    os.makedirs(path, exist_ok=True)
+    return str(path)
+
+
+def requested_modes(request):
+    value = request.GET.get('__profile')
+    if not value:
+        return set()
+    modes = {mode.strip() for mode in value.lower().split(',')}
+    if 'all' in modes:
+        return set(MODES)
+    return modes & MODES
+
+
+class SqlTimeline:
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            end = perf_counter()
+            self.queries.append({
+                'start_ms': round((start - self.started) * 1000, 2),
+                'duration_ms': round((end - start) * 1000, 2),
+                'database': context['connection'].alias,
+                'sql': sql,
+                'params': repr(params)[:500],
+                'origin': query_origin(),
+            })
+    
+    def summary(self):
+        """Identical query shapes, most repeated first (N+1 patterns stand out)"""
+        shapes = {}
+        for query in self.queries:
+            shape = shapes.setdefault(normalize_sql(query['sql']), {'count': 0, 'total_ms': 0.0})
+            shape['count'] += 1
+            shape['total_ms'] = round(shape['total_ms'] + query['duration_ms'], 2)
+        return sorted(
+            ({'sql': sql, **totals} for sql, totals in shapes.items()),
+            key=lambda shape: (-shape['count'], -shape['total_ms']),
+        )
+
+
+class Capture:
+    """Context manager collecting the requested profiles around one request"""
+    
+    def __init__(self, modes):
+        self.modes = modes
+        self.profiler = None
+        self.timeline = None
+        self.tracing = False
+        self.allocations = None
+        self.duration = 0.0
+        self._stack = ExitStack()
+    
+    def __enter__(self):
+        self.started = perf_counter()
+        if 'sql' in self.modes:
+            self.timeline = SqlTimeline(self.started)
+            for connection in connections.all():
+                self._stack.enter_context(connection.execute_wrapper(self.timeline))
+        if 'mem' in self.modes and not tracemalloc.is_tracing() and _tracemalloc_lock.acquire(blocking=False):
+            self.tracing = True
+            tracemalloc.start(10)
+        if 'cpu' in self.modes:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+    
+    def __exit__(self, *exc_info):
+        if self.profiler:
+            self.profiler.disable()
+        self.duration = perf_counter() - self.started
+        if self.tracing:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _tracemalloc_lock.release()
+            self.allocations = {
+                'current_kb': round(current / 1024, 1),
+                'peak_kb': round(peak / 1024, 1),
+                'top': [
+                    {'location': str(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:25]
+                ],
+            }
+        self._stack.close()
+        return False
+    
+    def save(self, request, response, user):
+        profile_id = f"{timezone.now().strftime('%Y%m%d%H%M%S%f')}-{secrets.token_hex(4)}"
+        directory = profiles_dir()
+        report = {
+            'id': profile_id,
+            'captured_at': timezone.now().isoformat(),
+            'user': user.email,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(self.duration * 1000, 2),
+            'modes': sorted(self.modes),
+        }
+        if self.profiler:
+            self.profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+            out = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=out)
+            stats.sort_stats('cumulative').print_stats(get_setting('TOP_FUNCTIONS'))
+            report['cpu'] = out.getvalue()
+        if self.timeline:
+            report['sql'] = {
+                'count': len(self.timeline.queries),
+                'total_ms': round(sum(q['duration_ms'] for q in self.timeline.queries), 2),
+                'by_shape': self.timeline.summary(),
+                'timeline': self.timeline.queries,
+            }
+        if self.allocations:
+            report['mem'] = self.allocations
+        
+        with open(os.path.join(directory, f'{profile_id}.json'), 'w') as f:
+            json.dump(report, f)
+        prune(directory)
+        return profile_id
+
+
+def prune(directory):
+    """Keep only the newest MAX_CAPTURES captures"""
+    reports = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    for name in reports[:-get_setting('MAX_CAPTURES')]:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, name[:-5] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_captures():
+    directory = profiles_dir()
+    captures = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as f:
+                report = json.load(f)
+            captures.append({key: report.get(key) for key in
+                             ('id', 'captured_at', 'user', 'method', 'path', 'status', 'duration_ms', 'modes')})
+    return captures
+
+
+def capture_path(profile_id, suffix):
+    """Absolute path of a stored capture, or None if the id is unknown"""
+    if not all(char.isalnum() or char == '-' for char in profile_id):
+        return None
+    path = os.path.join(profiles_dir(), f'{profile_id}{suffix}')
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,150 @@
+"""
+Concurrent-connection capacity of the WSGI and ASGI deployments.
+
+Each server is started as a subprocess on a free port and driven by a small
+asyncio HTTP/1.1 client: ``concurrency`` connections issue requests back to
+back, while ``slow_clients`` connections trickle a request header a byte at
+a time, the way a phone on a bad network does. A sync WSGI worker is stuck
+with a slow client until it finishes or times out; an ASGI worker is not.
+"""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVERS = {
+    'wsgi': lambda port, workers: [
+        sys.executable, '-m', 'gunicorn', 'aiverse_api.wsgi:application',
+        '--workers', str(workers), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+    ],
+    'asgi': lambda port, workers: [
+        sys.executable, '-m', 'uvicorn', 'aiverse_api.asgi:application',
+        '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning',
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, workers, cwd, timeout=30):
+    """Start a server; its output goes to a temporary file so a full pipe never blocks it"""
+    port = free_port()
+    output = tempfile.TemporaryFile()
+    process = subprocess.Popen(SERVERS[kind](port, workers), cwd=cwd, env=os.environ.copy(),
+                               stdout=output, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            output.seek(0)
+            raise RuntimeError(f'{kind} server exited: {output.read().decode()[-500:]}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            process.output = output
+            return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{kind} server did not start within {timeout}s')
+
+
+def stop_server(process, timeout=10):
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    process.output.close()
+
+
+async def _request(port, path, connection):
+    if connection is None:
+        connection = await asyncio.open_connection('127.0.0.1', port)
+    reader, writer = connection
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: application/json\r\n\r\n'.encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(':') for line in lines[1:] if line)}
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    if headers.get('connection', '').lower() == 'close':
+        writer.close()
+        connection = None
+    return status, connection
+
+
+async def _client(port, paths, stop_at, latencies, errors, timeout):
+    connection = None
+    i = 0
+    while time.monotonic() < stop_at:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.monotonic()
+        try:
+            status, connection = await asyncio.wait_for(_request(port, path, connection), timeout)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError, ValueError):
+            errors.append(path)
+            if connection:
+                connection[1].close()
+            connection = None
+            continue
+        if status >= 500:
+            errors.append(path)
+        else:
+            latencies.append(time.monotonic() - start)
+    if connection:
+        connection[1].close()
+
+
+async def _slow_client(port, stop_at):
+    """Send a request header one byte per second until the run ends"""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    except OSError:
+        return
+    request = b'GET /api/events/ HTTP/1.1\r\nHost: 127.0.0.1\r\nX-Padding: ' + b'x' * 10_000
+    try:
+        for byte in request:
+            if time.monotonic() >= stop_at:
+                break
+            writer.write(bytes([byte]))
+            await writer.drain()
+            await asyncio.sleep(1)
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _load(port, paths, concurrency, slow_clients, duration, timeout):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+    slow = [asyncio.create_task(_slow_client(port, stop_at)) for _ in range(slow_clients)]
+    # Give slow clients time to occupy their workers
+    if slow_clients:
+        await asyncio.sleep(1)
+    start = time.monotonic()
+    await asyncio.gather(*(_client(port, paths, stop_at, latencies, errors, timeout) for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+    await asyncio.gather(*slow)
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None,
+    }
+
+
+def measure(port, paths, concurrency, slow_clients, duration, timeout=5):
+    return asyncio.run(_load(port, paths, concurrency, slow_clients, duration, timeout))
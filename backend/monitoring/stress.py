@@ -0,0 +1,215 @@
+"""
+Concurrency stress harness for the registration and payment flows.
+
+Jobs are plain tuples so the same ``perform`` runs in a thread or in a
+``spawn``-ed process. Model imports stay inside functions: a child process
+unpickles ``perform`` before Django is set up.
+"""
+import json
+import logging
+import statistics
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+
+FLOWS = ('registrations', 'payments', 'approvals')
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'BEGIN')
+
+
+def email(mode, flow, i):
+    return f'stress-{mode}-{flow}-{i}@example.com'
+
+
+def init_process(database_name, quiet):
+    """Point a spawned child at the parent's test database"""
+    import django
+    django.setup()
+    if quiet:
+        logging.disable(logging.CRITICAL)
+    from django.db import connections
+    connections['default'].settings_dict['NAME'] = database_name
+    from monitoring.benchmark import rate_limits_disabled
+    rate_limits_disabled().enable()
+
+
+class WriteTimer:
+    """Execute wrapper summing time spent in writes, which includes lock waits"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.locked = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(WRITE_PREFIXES):
+            return execute(sql, params, many, context)
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except Exception as exc:
+            if 'locked' in str(exc).lower():
+                self.locked += 1
+            raise
+        finally:
+            self.seconds += perf_counter() - start
+
+
+def perform(job):
+    """Run one request; returns (flow, status, seconds, write seconds, lock errors)"""
+    from django.db import connection
+    from django.test import Client
+    flow, method, path, data = job
+    client = Client(raise_request_exception=False)
+    timer = WriteTimer()
+    start = perf_counter()
+    with connection.execute_wrapper(timer):
+        if method == 'post':
+            response = client.post(path, json.dumps(data or {}), content_type='application/json')
+        else:
+            response = client.get(path)
+    return flow, response.status_code, perf_counter() - start, timer.seconds, timer.locked
+
+
+def seed(mode, users):
+    """Users waiting to submit a payment, and users with a pending payment to approve"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from events.models import Event, EventRegistration
+    from payments.models import Payment
+    User = get_user_model()
+
+    event = Event.objects.get(slug='ai-verse-4')
+    password = make_password(None)
+    created = {}
+    for flow in ('payments', 'approvals'):
+        created[flow] = User.objects.bulk_create([
+            User(email=email(mode, flow, i), username=email(mode, flow, i), full_name=f'Stress {i}', password=password)
+            for i in range(users)
+        ])
+    EventRegistration.objects.bulk_create([
+        EventRegistration(user=user, event=event, is_active=flow == 'payments')
+        for flow in created for user in created[flow]
+    ])
+    approvals = Payment.objects.bulk_create([
+        Payment(user=user, event=event, amount=event.registration_fee, status='pending')
+        for user in created['approvals']
+    ])
+    return [payment.pk for payment in approvals]
+
+
+def build_jobs(mode, flows, users, duplicates, approval_ids):
+    """Copies of the same request are adjacent so idle workers pick them up together"""
+    jobs = []
+    for i in range(users):
+        if 'registrations' in flows:
+            body = {'email': email(mode, 'registrations', i), 'fullName': f'Stress {i}'}
+            jobs += [('registrations', 'post', '/api/registrations/', body)] * duplicates
+        if 'payments' in flows:
+            body = {'email': email(mode, 'payments', i), 'amount': '1499.00', 'transaction_id': f'STRESS{i}'}
+            jobs += [('payments', 'post', '/api/payments/', body)] * duplicates
+        if 'approvals' in flows:
+            jobs += [('approvals', 'post', f'/api/payments/{approval_ids[i]}/approve/', None)] * duplicates
+    return jobs
+
+
+def run(mode, jobs, workers, database_name, quiet=True):
+    """Expected failures (500s, slow queries) are logged per request; ``quiet`` mutes them"""
+    if quiet:
+        logging.disable(logging.CRITICAL)
+    if mode == 'process':
+        executor = ProcessPoolExecutor(workers, mp_context=get_context('spawn'),
+                                       initializer=init_process, initargs=(database_name, quiet))
+    else:
+        executor = ThreadPoolExecutor(workers)
+    with executor:
+        if mode == 'process':
+            # Let every child finish django.setup() before timing starts
+            list(executor.map(perform, [('warmup', 'get', '/api/events/current/', None)] * workers))
+        start = perf_counter()
+        results = list(executor.map(perform, jobs))
+        elapsed = perf_counter() - start
+    logging.disable(logging.NOTSET)
+    if mode == 'thread':
+        from django.db import connections
+        connections.close_all()
+    return results, elapsed
+
+
+def summarize(results, elapsed):
+    report = {}
+    for flow in FLOWS:
+        rows = [row for row in results if row[0] == flow]
+        if not rows:
+            continue
+        latencies = sorted(row[2] * 1000 for row in rows)
+        statuses = {}
+        for row in rows:
+            statuses[row[1]] = statuses.get(row[1], 0) + 1
+        report[flow] = {
+            'requests': len(rows),
+            'statuses': dict(sorted(statuses.items())),
+            'p50_ms': round(statistics.median(latencies), 1),
+            'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+            'write_wait_ms': round(sum(row[3] for row in rows) * 1000, 1),
+            'lock_errors': sum(row[4] for row in rows),
+        }
+    report['throughput_rps'] = round(len(results) / elapsed, 1) if elapsed else 0
+    return report
+
+
+def check_invariants(mode, flows, users):
+    """Return a description of every broken invariant"""
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count, Q
+    from analytics.models import Activity
+    from events.admissions import drain
+    from events.models import Event, EventRegistration
+    from notifications.models import Notification
+    from payments.models import Payment
+    User = get_user_model()
+
+    event = Event.objects.get(slug='ai-verse-4')
+    failures = []
+    # Registrations for a capacity-limited event are queued; admit them as the workers would
+    drain(event.pk)
+
+    def per_user(flow, queryset, expected, label):
+        counts = dict(
+            queryset.filter(user__email__startswith=f'stress-{mode}-{flow}-')
+            .values_list('user__email').annotate(n=Count('id'))
+        )
+        wrong = [(address, counts.get(address, 0)) for address in (email(mode, flow, i) for i in range(users))
+                 if counts.get(address, 0) != expected]
+        if wrong:
+            failures.append(f'{flow}: {len(wrong)}/{users} users have {label} != {expected} (e.g. {wrong[0][0]}: {wrong[0][1]})')
+
+    if 'registrations' in flows:
+        per_user('registrations', EventRegistration.objects.filter(event=event), 1, 'registrations')
+        per_user('registrations', Payment.objects.filter(event=event), 1, 'payments')
+        per_user('registrations', Activity.objects.filter(activity_type='registration'), 1, 'registration activities')
+    if 'payments' in flows:
+        per_user('payments', Payment.objects.filter(event=event), 1, 'payments')
+    if 'approvals' in flows:
+        per_user('approvals', EventRegistration.objects.filter(event=event, is_active=True), 1, 'active registrations')
+        per_user('approvals', Activity.objects.filter(action=f'Payment approved for {event.title}'), 1, 'approval activities')
+        per_user('approvals', Notification.objects.filter(kind='approval').exclude(status='coalesced'), 1,
+                 'approval emails')
+
+    active = EventRegistration.objects.filter(event=event, is_active=True).count()
+    if event.max_participants and active > event.max_participants:
+        failures.append(f'capacity: {active} active registrations for {event.max_participants} seats')
+    if event.total_registrations != active:
+        failures.append(f'counters: event.total_registrations={event.total_registrations}, active registrations={active}')
+    totals = Payment.objects.aggregate(pending=Count('id', filter=Q(status='pending')),
+                                       approved=Count('id', filter=Q(status='approved')))
+    dashboard = json.loads(perform_dashboard())['stats']
+    for key in ('pending', 'approved'):
+        if dashboard[f'{key}_payments'] != totals[key]:
+            failures.append(f'counters: dashboard {key}_payments={dashboard[f"{key}_payments"]}, database={totals[key]}')
+    if not User.objects.filter(email__startswith=f'stress-{mode}-').exists():
+        failures.append('no stress users were created')
+    return failures
+
+
+def perform_dashboard():
+    from django.test import Client
+    return Client().get('/api/analytics/').content
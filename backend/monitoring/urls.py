@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('metrics', views.metrics_view, name='metrics'),
+    path('api/profiles/', views.profile_list, name='profile-list'),
+    path('api/profiles/<str:profile_id>/', views.profile_detail, name='profile-detail'),
+    path('api/profiles/<str:profile_id>/download/', views.profile_download, name='profile-download'),
+]
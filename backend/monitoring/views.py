@@ -0,0 +1,60 @@
+import ipaddress
+import json
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from users.views import IsAdminUser
+from . import metrics, profiling
+
+
+def _is_internal(request):
+    # A proxy in front adds X-Forwarded-For, and its own address is private
+    if 'HTTP_X_FORWARDED_FOR' in request.META:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return address.is_private or address.is_loopback
+
+
+@require_safe
+def metrics_view(request):
+    """Prometheus text exposition of all worker processes"""
+    token = metrics.get_setting('AUTH_TOKEN')
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif not metrics.get_setting('PUBLIC') and not _is_internal(request):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Recent profiling captures, newest first"""
+    return Response(profiling.list_captures())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_detail(request, profile_id):
+    """One capture: cProfile listing, SQL timeline and allocation summary"""
+    path = profiling.capture_path(profile_id, '.json')
+    if not path:
+        raise Http404('Profile not found')
+    with open(path) as f:
+        return Response(json.load(f))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_download(request, profile_id):
+    """Raw pstats dump for snakeviz / pstats"""
+    path = profiling.capture_path(profile_id, '.prof')
+    if not path:
+        raise Http404('Profile not found')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{profile_id}.prof')
@@ -0,0 +1,94 @@
+"""
+Concurrent write throughput of a plain SQLite connection versus the tuned
+backend in ``aiverse_api.sqlite``.
+
+Each operation is the pattern that breaks a default SQLite setup: a
+transaction that reads and then writes, followed by an autocommit counter
+update. Workers run as threads or ``spawn``-ed processes, so model-free
+imports only at module level.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+from .stress import WriteTimer
+
+PLAIN = ('django.db.backends.sqlite3', {})
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS bench_entry (id INTEGER PRIMARY KEY, worker INTEGER, n INTEGER, payload TEXT)',
+    'CREATE TABLE IF NOT EXISTS bench_counter (id INTEGER PRIMARY KEY, value INTEGER)',
+    'INSERT OR IGNORE INTO bench_counter (id, value) VALUES (1, 0)',
+]
+
+
+def connect(engine, name, options):
+    """Register an alias for the database file (once per process) and return its connection"""
+    from django.db import connections
+    alias = f'writebench:{name}'
+    if alias not in connections.settings:
+        connections.settings[alias] = {
+            **connections.settings['default'], 'ENGINE': engine, 'NAME': name, 'OPTIONS': options,
+            'CONN_MAX_AGE': 0, 'TEST': {},
+        }
+    return connections[alias]
+
+
+def create_schema(engine, name, options):
+    connection = connect(engine, name, options)
+    with connection.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+    connection.close()
+
+
+def init_process():
+    import django
+    django.setup()
+    logging.disable(logging.CRITICAL)
+
+
+def write_worker(engine, name, options, worker, operations):
+    """Returns (successful operations, failed operations, seconds in writes)"""
+    from django.db import transaction
+    connection = connect(engine, name, options)
+    timer = WriteTimer()
+    done = failed = 0
+    with connection.execute_wrapper(timer):
+        for _ in range(operations):
+            try:
+                with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                    cursor.execute('SELECT COALESCE(MAX(n), 0) FROM bench_entry WHERE worker = %s', [worker])
+                    n = cursor.fetchone()[0] + 1
+                    cursor.execute('INSERT INTO bench_entry (worker, n, payload) VALUES (%s, %s, %s)',
+                                   [worker, n, 'x' * 200])
+                with connection.cursor() as cursor:
+                    cursor.execute('UPDATE bench_counter SET value = value + 1 WHERE id = 1')
+                done += 1
+            except Exception:
+                failed += 1
+    connection.close()
+    return done, failed, timer.seconds
+
+
+def run(engine, name, options, mode, workers, operations):
+    create_schema(engine, name, options)
+    if mode == 'process':
+        executor = ProcessPoolExecutor(workers, mp_context=get_context('spawn'), initializer=init_process)
+    else:
+        executor = ThreadPoolExecutor(workers)
+    with executor:
+        if mode == 'process':
+            list(executor.map(pow, range(workers), range(workers)))
+        start = perf_counter()
+        futures = [executor.submit(write_worker, engine, name, options, worker, operations) for worker in range(workers)]
+        results = [future.result() for future in futures]
+        elapsed = perf_counter() - start
+    done = sum(row[0] for row in results)
+    return {
+        'ops': done,
+        'failed': sum(row[1] for row in results),
+        'ops_per_second': round(done / elapsed, 1),
+        'write_wait_ms': round(sum(row[2] for row in results) * 1000, 1),
+        'seconds': round(elapsed, 2),
+    }
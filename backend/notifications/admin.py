@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'kind', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['kind', 'status', 'created_at']
+    search_fields = ['to_email', 'subject', 'user__full_name']
+    readonly_fields = ['created_at', 'sent_at']
+    ordering = ['-created_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
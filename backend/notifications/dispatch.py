@@ -0,0 +1,168 @@
+"""
+Queue notifications and deliver them in batches.
+
+``notify`` only renders and stores the message; a ``dispatch_notifications``
+task scheduled per BATCH_WINDOW sends everything queued over a single
+connection to the configured EMAIL_BACKEND.
+
+A dispatcher claims rows by moving them from ``queued`` to ``sending`` with
+``claimed_at`` set, and records each outcome only while its claim stands.
+Rows left ``sending`` past ``LEASE_SECONDS`` (a dispatcher that crashed or
+was killed mid-batch) are claimed again, so a message may be sent twice but
+is never stranded.
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'BATCH_WINDOW': 5,
+    'RATE_LIMIT_PER_MINUTE': 120,
+    'MAX_ATTEMPTS': 3,
+    'LEASE_SECONDS': 300,   # sending rows older than this are claimed again
+}
+
+
+def get_setting(key):
+    return getattr(settings, 'NOTIFICATIONS', {}).get(key, DEFAULTS[key])
+
+
+def _message(user, kind, context, coalesce_key=''):
+    context = {'user': user, **(context or {})}
+    return Notification(
+        user=user,
+        kind=kind,
+        to_email=user.email,
+        subject=render_to_string(f'notifications/{kind}_subject.txt', context).strip(),
+        body=render_to_string(f'notifications/{kind}_body.txt', context),
+        coalesce_key=coalesce_key,
+    )
+
+
+def notify(user, kind, context=None, coalesce_key=''):
+    """
+    Queue a ``kind`` email for ``user``. A still-queued notification with the
+    same ``coalesce_key`` is superseded, so only the latest state is sent.
+    """
+    if not user.email:
+        return None
+    
+    notification = _message(user, kind, context, coalesce_key)
+    if coalesce_key:
+        Notification.objects.filter(user=user, coalesce_key=coalesce_key, status='queued').update(status='coalesced')
+    notification.save()
+    # Scheduling after commit guarantees the dispatcher can see the row
+    transaction.on_commit(schedule_dispatch)
+    return notification
+
+
+def notify_many(users, kind, context=None):
+    """Queue a ``kind`` email for each of ``users`` in one insert (nothing is coalesced)"""
+    notifications = Notification.objects.bulk_create(
+        [_message(user, kind, context) for user in users if user.email]
+    )
+    if notifications:
+        transaction.on_commit(schedule_dispatch)
+    return notifications
+
+
+def schedule_dispatch(delay=None):
+    """Ensure one dispatch task runs at the end of the current batch window"""
+    from .tasks import dispatch_notifications
+    
+    window = get_setting('BATCH_WINDOW')
+    run_at = timezone.now() + timedelta(seconds=window if delay is None else delay)
+    bucket = int(run_at.timestamp() // max(window, 1))
+    dispatch_notifications.enqueue(idempotency_key=f'notifications:dispatch:{bucket}', run_at=run_at)
+
+
+def _claimable(now):
+    lease_expired = now - timedelta(seconds=get_setting('LEASE_SECONDS'))
+    return Q(status='queued') | Q(status='sending', claimed_at__lt=lease_expired)
+
+
+def _claim_batch(limit):
+    now = timezone.now()
+    ids = list(
+        Notification.objects.filter(_claimable(now)).order_by('created_at').values_list('id', flat=True)[:limit]
+    )
+    claimed = []
+    for notification_id in ids:
+        if Notification.objects.filter(_claimable(now), id=notification_id).update(status='sending', claimed_at=now):
+            claimed.append(notification_id)
+    return list(Notification.objects.filter(id__in=claimed, claimed_at=now).order_by('created_at'))
+
+
+def send_pending():
+    """Send one rate-limited batch; returns the number of messages sent"""
+    now = timezone.now()
+    sent_last_minute = Notification.objects.filter(status='sent', sent_at__gte=now - timedelta(minutes=1)).count()
+    budget = min(get_setting('BATCH_SIZE'), get_setting('RATE_LIMIT_PER_MINUTE') - sent_last_minute)
+    if budget <= 0:
+        schedule_dispatch(delay=60)
+        return 0
+    
+    batch = _claim_batch(budget)
+    if not batch:
+        _schedule_next()
+        return 0
+    
+    sent = 0
+    # Outcomes are recorded only while this dispatcher's claim stands
+    claimed = Notification.objects.filter(status='sending', claimed_at=batch[0].claimed_at)
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        # Put the batch back; the task is retried with backoff
+        claimed.filter(id__in=[n.id for n in batch]).update(status='queued', claimed_at=None)
+        raise
+    
+    try:
+        for notification in batch:
+            message = EmailMessage(
+                notification.subject,
+                notification.body,
+                settings.DEFAULT_FROM_EMAIL,
+                [notification.to_email],
+                connection=connection,
+            )
+            attempts = notification.attempts + 1
+            try:
+                message.send()
+            except Exception as exc:
+                logger.warning('Notification #%s to %s failed: %s', notification.id, notification.to_email, exc)
+                status = 'failed' if attempts >= get_setting('MAX_ATTEMPTS') else 'queued'
+                claimed.filter(id=notification.id).update(
+                    status=status, attempts=attempts, error=str(exc), claimed_at=None
+                )
+            else:
+                sent += 1
+                claimed.filter(id=notification.id).update(
+                    status='sent', attempts=attempts, sent_at=timezone.now(), error=''
+                )
+    finally:
+        connection.close()
+    
+    _schedule_next()
+    return sent
+
+
+def _schedule_next():
+    """Dispatch again while rows are queued, or once another dispatcher's claim would expire"""
+    if Notification.objects.filter(status='queued').exists():
+        schedule_dispatch()
+        return
+    oldest = Notification.objects.filter(status='sending').order_by('claimed_at').values_list('claimed_at', flat=True).first()
+    if oldest is not None:
+        expires = oldest + timedelta(seconds=get_setting('LEASE_SECONDS')) - timezone.now()
+        schedule_dispatch(delay=max(expires.total_seconds(), 0) + 1)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a dispatcher took the row for sending', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('registration', 'Registration'), ('approval', 'Payment Approved'), ('rejection', 'Payment Rejected'), ('waitlist', 'Waitlisted')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    """Outgoing email queued for batched delivery"""
+    KIND_CHOICES = [
+        ('registration', 'Registration'),
+        ('approval', 'Payment Approved'),
+        ('rejection', 'Payment Rejected'),
+        ('waitlist', 'Waitlisted'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('coalesced', 'Coalesced'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    coalesce_key = models.CharField(max_length=100, blank=True, help_text="Newer notifications with the same key replace queued ones")
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text="When a dispatcher took the row for sending")
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['user', 'coalesce_key', 'status']),
+        ]
+        verbose_name = 'Notification'
+        verbose_name_plural = 'Notifications'
+    
+    def __str__(self):
+        return f"{self.to_email} - {self.kind} - {self.status}"
@@ -0,0 +1,7 @@
+from taskqueue.queue import task
+from .dispatch import send_pending
+
+
+@task(max_attempts=10)
+def dispatch_notifications():
+    send_pending()
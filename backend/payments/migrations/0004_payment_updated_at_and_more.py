@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:46
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows last changed when they were processed, or else submitted
+    Payment = apps.get_model('payments', 'Payment')
+    Payment.objects.update(updated_at=Coalesce('processed_at', 'submitted_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_payment_payments_pa_submitt_5d3704_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['updated_at', 'id'], name='payments_pa_updated_e56f5f_idx'),
+        ),
+    ]
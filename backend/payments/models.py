@@ -23,9 +23,16 @@ class Payment(models.Model):
     submitted_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
     processed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='processed_payments')
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['-submitted_at']),
+            models.Index(fields=['status', '-submitted_at']),
+            models.Index(fields=['user', 'event']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
     
@@ -1,4 +1,7 @@
+from urllib.parse import urlencode
+from django.urls import reverse
 from rest_framework import serializers
+from files.serving import sign_media
 from .models import Payment
 
 
@@ -22,5 +25,8 @@ class PaymentSerializer(serializers.ModelSerializer):
     def get_payment_screenshot_url(self, obj):
         request = self.context.get('request')
         if obj.payment_screenshot and request:
-            return request.build_absolute_uri(obj.payment_screenshot.url)
+            # Screenshots are private; hand out a signed link to the checked endpoint
+            url = reverse('payments-screenshot', kwargs={'pk': obj.pk})
+            query = urlencode({'sig': sign_media(obj.payment_screenshot.name)})
+            return request.build_absolute_uri(f'{url}?{query}')
         return None
@@ -1,7 +1,11 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
 from .models import Payment
 from events.models import EventRegistration
+from events import admissions, seats
+from events.passes import issue_passes
 from analytics.models import Activity
 
 @receiver(post_save, sender=Payment)
@@ -16,11 +20,19 @@ def payment_post_save(sender, instance, created, **kwargs):
     
     # 2. Handle Status Changes (Approval)
     if instance.status == 'approved' and instance.event:
-        # Activate the registration
-        EventRegistration.objects.filter(
+        # Activate the registration and sign its entry pass
+        registrations = EventRegistration.objects.filter(
             user=instance.user, 
             event=instance.event
-        ).update(is_active=True)
+        )
+        if instance.event.max_participants:
+            # A seat given up earlier is claimed through the queue, so the cap holds
+            if registrations.filter(is_active=False).exists():
+                admissions.enqueue(instance.user, instance.event)
+        else:
+            registrations.update(is_active=True, updated_at=timezone.now())
+        issue_passes(registrations)
+        transaction.on_commit(seats.feed.wake)
         
         # Log Approval Activity
         # Check if we haven't logged this recently to avoid duplicates if saved multiple times
@@ -30,3 +42,12 @@ def payment_post_save(sender, instance, created, **kwargs):
             action=f"Payment approved for {instance.event.title}",
             activity_type='payment'
         )
+    
+    # 3. Rejection frees the seat for the waitlist (unless another payment was approved)
+    paid = Payment.objects.filter(user=instance.user, event=instance.event, status='approved')
+    if instance.status == 'rejected' and instance.event and not paid.exists():
+        if EventRegistration.objects.filter(user=instance.user, event=instance.event, is_active=True).update(
+                is_active=False, updated_at=timezone.now()):
+            transaction.on_commit(seats.feed.wake)
+            if instance.event.max_participants:
+                admissions.seats_freed(instance.event_id)
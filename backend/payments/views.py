@@ -2,33 +2,41 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.http import Http404
 from django.utils import timezone
+from aiverse_api.ratelimit import PaymentThrottle
+from changes.feed import ChangeFeedMixin
+from files.serving import check_media_signature, serve_file
+from files.uploads import as_file, claim_upload
+from idempotency.keys import idempotent
 from .models import Payment
 from .serializers import PaymentSerializer
 from users.views import IsAdminUser
 from analytics.models import Activity
+from events.models import EventRegistration
+from notifications.dispatch import notify
 
 
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for payment management"""
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     
     def get_permissions(self):
-        if self.action in ['approve', 'reject', 'list', 'retrieve', 'update', 'partial_update', 'destroy', 'create']:
+        if self.action in ['approve', 'reject', 'list', 'retrieve', 'update', 'partial_update', 'destroy', 'create', 'screenshot']:
             return [AllowAny()]
         return [IsAuthenticated()]
     
+    def get_throttles(self):
+        if self.action == 'create':
+            return [PaymentThrottle()]
+        return super().get_throttles()
+    
     def get_queryset(self):
         queryset = Payment.objects.select_related('user', 'event', 'processed_by')
         
-        # Filter by status
-        status_filter = self.request.query_params.get('status', None)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
         # Filter by user (for non-admin users)
         if hasattr(self.request.user, 'is_admin'):
             if not self.request.user.is_admin:
@@ -40,6 +48,17 @@ class PaymentViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('-submitted_at')
     
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        
+        # Filter by status
+        status_filter = self.request.query_params.get('status', None)
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        return queryset
+    
+    @idempotent
     def create(self, request, *args, **kwargs):
         data = request.data.copy()
         
@@ -70,9 +89,21 @@ class PaymentViewSet(viewsets.ModelViewSet):
         if event:
             data['event'] = event.id
             
+        # A screenshot sent through /api/uploads/ instead of multipart
+        upload = None
+        if data.get('upload_id'):
+            upload = claim_upload(data['upload_id'], 'payment_screenshot')
+            data['payment_screenshot'] = as_file(upload)
+            
         serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer, user=user)
+        try:
+            serializer.is_valid(raise_exception=True)
+            self.perform_create(serializer, user=user)
+        finally:
+            if upload:
+                data['payment_screenshot'].close()
+        if upload:
+            upload.delete()
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
@@ -106,6 +137,12 @@ class PaymentViewSet(viewsets.ModelViewSet):
             activity_type='payment'
         )
         
+        if payment.event:
+            registration = EventRegistration.objects.filter(user=payment.user, event=payment.event).first()
+            notify(payment.user, 'approval',
+                   {'payment': payment, 'event': payment.event, 'registration': registration},
+                   coalesce_key=f'payment:{payment.pk}')
+        
         serializer = self.get_serializer(payment)
         return Response(serializer.data)
     
@@ -119,5 +156,26 @@ class PaymentViewSet(viewsets.ModelViewSet):
         payment.notes = request.data.get('notes', payment.notes)
         payment.save()
         
+        if payment.event:
+            notify(payment.user, 'rejection', {'payment': payment, 'event': payment.event},
+                   coalesce_key=f'payment:{payment.pk}')
+        
         serializer = self.get_serializer(payment)
         return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def screenshot(self, request, pk=None):
+        """Serve the payment screenshot to its owner, an admin or a signed URL"""
+        payment = self.get_object()
+        if not payment.payment_screenshot:
+            raise Http404('No screenshot uploaded')
+        
+        name = payment.payment_screenshot.name
+        user = request.user
+        allowed = check_media_signature(name, request.query_params.get('sig')) or (
+            user.is_authenticated and (user.is_admin or user.id == payment.user_id)
+        )
+        if not allowed:
+            return Response({'error': 'Not allowed to view this screenshot'}, status=status.HTTP_403_FORBIDDEN)
+        
+        return serve_file(request, name, private=True)
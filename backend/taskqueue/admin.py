@@ -0,0 +1,17 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'idempotency_key', 'last_error']
+    readonly_fields = ['created_at', 'updated_at', 'finished_at', 'locked_by', 'locked_at']
+    ordering = ['-created_at']
+    actions = ['retry_tasks']
+    
+    @admin.action(description='Retry selected tasks now')
+    def retry_tasks(self, request, queryset):
+        queryset.exclude(status='running').update(status='pending', run_at=timezone.now(), attempts=0)
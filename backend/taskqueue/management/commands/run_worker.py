@@ -0,0 +1,48 @@
+import multiprocessing
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from django.db import connections
+from taskqueue.processes import run_worker_process
+from taskqueue.queue import get_setting
+from taskqueue.worker import work
+
+
+class Command(BaseCommand):
+    help = 'Run background task workers from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=get_setting('WORKERS'),
+                            help='Number of concurrent workers')
+        parser.add_argument('--pool', choices=['thread', 'process'], default=get_setting('POOL'),
+                            help='Run workers as threads (I/O-bound tasks) or processes (CPU-bound tasks)')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no tasks are due instead of polling forever')
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        once = options['once']
+
+        if options['pool'] == 'process':
+            context = multiprocessing.get_context('spawn')
+            stop_event = context.Event()
+            # Never share an open database connection with the children
+            connections.close_all()
+            runners = [context.Process(target=run_worker_process, args=(stop_event, once)) for _ in range(workers)]
+        else:
+            stop_event = threading.Event()
+            runners = [threading.Thread(target=work, args=(stop_event, once)) for _ in range(workers)]
+
+        def shutdown(signum, frame):
+            self.stdout.write(self.style.WARNING('Stopping workers after their current task...'))
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(self.style.SUCCESS(f"Started {workers} {options['pool']} workers"))
+        for runner in runners:
+            runner.start()
+        for runner in runners:
+            runner.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
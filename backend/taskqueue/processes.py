@@ -0,0 +1,18 @@
+"""
+Entry point for worker processes started with the ``spawn`` method.
+
+Kept free of model imports: the child unpickles this function before
+Django is set up.
+"""
+import signal
+
+
+def run_worker_process(stop_event, once):
+    import django
+    django.setup()
+    # The parent handles signals and sets stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    from .worker import work
+    work(stop_event, once=once)
@@ -0,0 +1,101 @@
+"""
+Task registration and enqueueing.
+
+Declare work in an app's ``tasks.py``::
+
+    from taskqueue.queue import task
+
+    @task(max_attempts=3)
+    def send_receipt(payment_id):
+        ...
+
+    send_receipt.delay(payment.id)
+    send_receipt.enqueue(args=[payment.id], idempotency_key=f'receipt:{payment.id}')
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Task
+
+DEFAULTS = {
+    'WORKERS': 4,
+    'POOL': 'thread',
+    'POLL_INTERVAL': 1.0,
+    'BATCH_SIZE': 10,
+    'LEASE_SECONDS': 300,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,
+    'RETRY_BACKOFF_MAX': 60 * 60,
+    'EAGER': False,
+}
+
+registry = {}
+
+
+def get_setting(key):
+    return getattr(settings, 'TASKQUEUE', {}).get(key, DEFAULTS[key])
+
+
+class TaskFunction:
+    """Wrapper returned by ``@task``; calling it still runs the function inline"""
+    
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+    
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+    
+    def delay(self, *args, **kwargs):
+        return enqueue(self.name, args=args, kwargs=kwargs, max_attempts=self.max_attempts)
+    
+    def enqueue(self, args=(), kwargs=None, idempotency_key=None, run_at=None, countdown=None):
+        if countdown is not None:
+            run_at = timezone.now() + timedelta(seconds=countdown)
+        return enqueue(self.name, args=args, kwargs=kwargs, idempotency_key=idempotency_key,
+                       run_at=run_at, max_attempts=self.max_attempts)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Register ``func`` as a background task under ``module.function``"""
+    def decorator(f):
+        task_name = name or f'{f.__module__}.{f.__name__}'
+        wrapper = TaskFunction(f, task_name, max_attempts)
+        registry[task_name] = wrapper
+        return wrapper
+    
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, idempotency_key=None, run_at=None, max_attempts=None):
+    """
+    Persist a task for the workers.
+    
+    The row is written in the caller's transaction, so workers only see it
+    once the surrounding writes commit and it disappears with a rollback.
+    A repeated ``idempotency_key`` returns the existing task instead.
+    """
+    if name not in registry:
+        raise KeyError(f"Unknown task '{name}'")
+    
+    defaults = {
+        'name': name,
+        'args': list(args),
+        'kwargs': kwargs or {},
+        'run_at': run_at or timezone.now(),
+        'max_attempts': max_attempts or get_setting('MAX_ATTEMPTS'),
+    }
+    if idempotency_key:
+        queued, created = Task.objects.get_or_create(idempotency_key=idempotency_key, defaults=defaults)
+    else:
+        queued, created = Task.objects.create(**defaults), True
+    
+    if created and get_setting('EAGER'):
+        # Development mode without a worker: run right after commit
+        from .worker import execute
+        transaction.on_commit(lambda: execute(Task.objects.get(pk=queued.pk)))
+    return queued
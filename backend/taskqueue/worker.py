@@ -0,0 +1,129 @@
+"""
+Worker loop: claim due tasks, run them and record the outcome.
+
+Claims are conditional updates on ``status``, so any number of threads or
+processes can poll the same table without handing a task out twice.
+Tasks left ``running`` past the lease (a crashed worker) are claimed again.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Task
+from .queue import get_setting, registry
+
+logger = logging.getLogger(__name__)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def _due_filter(now):
+    lease_expired = now - timedelta(seconds=get_setting('LEASE_SECONDS'))
+    return Q(status='pending', run_at__lte=now) | Q(status='running', locked_at__lt=lease_expired)
+
+
+def claim_tasks(worker_id, limit):
+    """Lock up to ``limit`` due tasks for ``worker_id`` and return them"""
+    now = timezone.now()
+    due = Task.objects.filter(_due_filter(now)).order_by('run_at', 'id')
+    
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Task.objects.filter(id__in=ids).update(
+                status='running', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+            )
+    else:
+        ids = []
+        for task_id in due.values_list('id', flat=True)[:limit]:
+            claimed = Task.objects.filter(_due_filter(now), id=task_id).update(
+                status='running', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+            )
+            if claimed:
+                ids.append(task_id)
+    
+    return list(Task.objects.filter(id__in=ids, locked_by=worker_id).order_by('run_at', 'id'))
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, capped at RETRY_BACKOFF_MAX seconds"""
+    base = get_setting('RETRY_BACKOFF') * (2 ** max(attempts - 1, 0))
+    delay = min(base, get_setting('RETRY_BACKOFF_MAX'))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def execute(task):
+    """
+    Run one claimed task and persist success, a retry or a final failure.
+    
+    Each outcome is written only while the task is still locked by this
+    worker. If the lease expired and another worker reclaimed the task, this
+    run's outcome is dropped and the newer run's outcome stands.
+    """
+    claim = Task.objects.filter(pk=task.pk, status='running' if task.locked_by else 'pending',
+                                locked_by=task.locked_by)
+    now = timezone.now()
+    if task.attempts > task.max_attempts:
+        # Reclaimed after its lease expired on the last attempt
+        claim.update(status='failed', last_error=task.last_error or 'Lease expired on the last attempt',
+                     finished_at=now, updated_at=now)
+        logger.error('Task %s #%s failed permanently: lease expired after %s attempts',
+                     task.name, task.pk, task.max_attempts)
+        return False
+    
+    func = registry.get(task.name)
+    try:
+        if func is None:
+            raise LookupError(f"Task '{task.name}' is not registered in this worker")
+        func(*task.args, **task.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if task.attempts < task.max_attempts:
+            run_at = now + timedelta(seconds=retry_delay(task.attempts))
+            recorded = claim.update(
+                status='pending', run_at=run_at, last_error=error, locked_by='', locked_at=None, updated_at=now
+            )
+            if recorded:
+                logger.warning('Task %s #%s failed (attempt %s), retrying at %s', task.name, task.pk, task.attempts, run_at)
+        else:
+            recorded = claim.update(
+                status='failed', last_error=error, finished_at=now, updated_at=now
+            )
+            if recorded:
+                logger.error('Task %s #%s failed permanently after %s attempts', task.name, task.pk, task.attempts)
+        if not recorded:
+            logger.warning('Task %s #%s failed after its lease was taken over; outcome dropped', task.name, task.pk)
+        return False
+    
+    now = timezone.now()
+    if not claim.update(status='done', finished_at=now, updated_at=now, last_error=''):
+        logger.warning('Task %s #%s finished after its lease was taken over; outcome dropped', task.name, task.pk)
+    return True
+
+
+def work(stop_event, once=False):
+    """Poll for due tasks until ``stop_event`` is set (or the queue drains with ``once``)"""
+    worker_id = worker_name()
+    batch_size = get_setting('BATCH_SIZE')
+    poll_interval = get_setting('POLL_INTERVAL')
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            tasks = claim_tasks(worker_id, batch_size)
+            for task in tasks:
+                execute(task)
+            if not tasks:
+                if once:
+                    break
+                stop_event.wait(poll_interval)
+    finally:
+        connection.close()
@@ -0,0 +1,153 @@
+"""
+JWT authentication without a user query on most requests.
+
+``JWTAuthentication`` loads the ``User`` row on every authenticated call.
+This keeps a snapshot of the fields permission checks read, per user id,
+together with the token version it was verified for: the token's
+``hash_password`` claim (``CHECK_REVOKE_TOKEN``), which changes with the
+password. ``users.signals`` drops the snapshot when the user is saved or
+deleted, but with a per-process cache (the default LocMem) that reaches
+only the saving worker. So every process also polls the table for users
+saved since its last look (``updated_at``, indexed) every
+``REFRESH_SECONDS``, and refuses a snapshot older than the user's latest
+save. A password change, deactivation or demotion therefore reaches every
+worker within ``REFRESH_SECONDS`` whatever the cache backend. A deleted
+user leaves no row to poll; deactivate to lock someone out at once. Revoked
+tokens (logout, rotation) are refused before either lookup
+(``users.revocation``).
+
+A user built from a snapshot defers every other field. Reading one of them
+loads the whole row in one query, so views that need more cost what they
+did before.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DatabaseError, router
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .revocation import is_revoked
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CACHE': 'default',     # cache alias
+    'TIMEOUT': 60,          # seconds a snapshot is kept
+    'REFRESH_SECONDS': 2,   # how soon other processes' user changes are seen
+}
+
+SNAPSHOT_FIELDS = ('id', 'email', 'username', 'full_name', 'is_active', 'is_admin', 'is_staff',
+                   'is_superuser', 'updated_at')
+
+# Saves commit out of updated_at order when transactions overlap, so each
+# poll re-reads this far behind the last one (seeing a change twice is harmless)
+CHANGE_SLACK = timedelta(seconds=30)
+
+
+def get_setting(key):
+    return getattr(settings, 'AUTH_USER_CACHE', {}).get(key, DEFAULTS[key])
+
+
+def cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def forget(user_id):
+    caches[get_setting('CACHE')].delete(cache_key(user_id))
+
+
+def _fields():
+    # Model.from_db expects the loaded values in concrete field order
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname in SNAPSHOT_FIELDS]
+
+
+def snapshot(user):
+    return tuple(getattr(user, name) for name in _fields())
+
+
+def from_snapshot(values):
+    User = get_user_model()
+    user = User.from_db(router.db_for_read(User), _fields(), values)
+    user._auth_snapshot = True
+    return user
+
+
+class UserChanges:
+    """Latest ``updated_at`` of each user saved in the last ``TIMEOUT``, polled from the table"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = {}
+        self._cursor = None
+        self._polled_at = 0.0
+
+    def is_stale(self, user):
+        self._sync()
+        changed = self._changed.get(user.pk)
+        return changed is not None and changed > user.updated_at
+
+    def _sync(self):
+        if self._cursor is not None and time.monotonic() - self._polled_at < get_setting('REFRESH_SECONDS'):
+            return
+        # Another thread already polling: check against the changes as they are
+        if not self._lock.acquire(blocking=self._cursor is None):
+            return
+        try:
+            if self._cursor is None or time.monotonic() - self._polled_at >= get_setting('REFRESH_SECONDS'):
+                self._poll()
+        except DatabaseError:
+            if self._cursor is None:
+                raise
+            logger.exception('User change poll failed')
+        finally:
+            self._polled_at = time.monotonic()
+            self._lock.release()
+
+    def _poll(self):
+        now = timezone.now()
+        # Snapshots older than TIMEOUT have expired, so older changes no longer matter
+        horizon = now - timedelta(seconds=get_setting('TIMEOUT')) - CHANGE_SLACK
+        since = horizon if self._cursor is None else max(horizon, self._cursor - CHANGE_SLACK)
+        changed = {user_id: updated_at for user_id, updated_at in self._changed.items() if updated_at >= horizon}
+        rows = get_user_model().objects.filter(updated_at__gte=since).order_by().values_list('id', 'updated_at')
+        for user_id, updated_at in rows:
+            if user_id not in changed or updated_at > changed[user_id]:
+                changed[user_id] = updated_at
+        self._changed, self._cursor = changed, now
+
+
+changes = UserChanges()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken('Token has been revoked')
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        version = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+        cache = caches[get_setting('CACHE')]
+
+        cached = cache.get(cache_key(user_id))
+        user = from_snapshot(cached[1]) if cached is not None and cached[0] == version else None
+        if user is not None and not changes.is_stale(user):
+            if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+                raise AuthenticationFailed('User is inactive', code='user_inactive')
+            return user
+
+        user = super().get_user(validated_token)
+        cache.set(cache_key(user_id), (version, snapshot(user)), get_setting('TIMEOUT'))
+        return user
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked tokens past their expiry (the signature check refuses them anyway)'
+
+    def handle(self, *args, **options):
+        count, _ = RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'Compacted {count} revoked tokens'))
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# Admin user search filters with icontains, which PostgreSQL runs as
+# UPPER(col::text) LIKE UPPER('%term%'); trigram GIN indexes on that
+# expression serve it without a sequential scan. Other databases skip this.
+SEARCH_COLUMNS = ['email', 'username', 'full_name']
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS users_user_{column}_trgm '
+            f'ON users_user USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS users_user_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_department_user_year_of_study'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_users_user_created_5b2332_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['updated_at', 'id'], name='users_user_updated_14bdf8_idx'),
+        ),
+    ]
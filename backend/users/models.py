@@ -20,14 +20,44 @@ class User(AbstractUser):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
         verbose_name = 'User'
         verbose_name_plural = 'Users'
     
     def __str__(self):
         return self.email
     
+    def refresh_from_db(self, using=None, fields=None):
+        # Users built from the authentication cache hold only the permission
+        # fields; the first other field read loads the whole row at once
+        if fields is not None and getattr(self, '_auth_snapshot', False):
+            self._auth_snapshot = False
+            fields = [field.attname for field in self._meta.concrete_fields]
+        super().refresh_from_db(using=using, fields=fields)
+    
     @property
     def profile_image_url(self):
         if self.profile_image:
             return self.profile_image.url
         return None
+
+
+class RevokedToken(models.Model):
+    """A JWT (access or refresh) refused until it would have expired anyway"""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-revoked_at']
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
+    
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,147 @@
+"""
+Revoked JWTs (logout, refresh token rotation).
+
+``RevokedToken`` rows, unique by ``jti``, are the record. Checking every
+request against the table would cost a query per call, so each process
+keeps a bloom filter of the revoked ids. A token the filter has never seen
+(nearly all of them) is accepted without touching the database. Only a
+filter hit, a revoked token or a rare false positive, is confirmed with an
+indexed lookup.
+
+The filter is built from the unexpired rows, then picks up revocations
+from other processes by polling for new ids every ``REFRESH_SECONDS``.
+Revocations made in this process are added immediately. Bloom filters
+cannot delete, so the filter is rebuilt every ``REBUILD_SECONDS``, or when
+it holds more ids than it was sized for. Rows for tokens past their expiry
+are useless because the signature check refuses those tokens anyway.
+``manage.py compact_revoked_tokens`` deletes them, and the next rebuild
+leaves them out.
+"""
+import logging
+import math
+import threading
+import time
+from hashlib import blake2b
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'REFRESH_SECONDS': 2,           # how soon other processes' revocations are seen
+    'REBUILD_SECONDS': 60 * 60,     # drop expired ids from the filter this often
+    'FALSE_POSITIVE_RATE': 0.01,    # share of unrevoked tokens that still cost a lookup
+    'MIN_CAPACITY': 10000,          # ids the filter is sized for, at least
+}
+
+# Revocations commit out of id order when transactions overlap, so each poll
+# re-reads this many ids below the cursor (adding an id twice is harmless)
+ID_SLACK = 100
+
+
+def get_setting(key):
+    return getattr(settings, 'TOKEN_REVOCATION', {}).get(key, DEFAULTS[key])
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationFilter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._count = 0
+        self._cursor = 0
+        self._built_at = self._polled_at = 0.0
+
+    def might_contain(self, jti):
+        self._sync()
+        return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+                self._count += 1
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._bloom is not None and now - self._polled_at < get_setting('REFRESH_SECONDS'):
+            return
+        # Another thread already polling: check against the filter as it is
+        if not self._lock.acquire(blocking=self._bloom is None):
+            return
+        try:
+            if self._bloom is None:
+                self._rebuild()
+            elif now - self._polled_at >= get_setting('REFRESH_SECONDS'):
+                if now - self._built_at >= get_setting('REBUILD_SECONDS') or self._count > self._bloom.capacity:
+                    self._rebuild()
+                else:
+                    self._poll()
+        except DatabaseError:
+            if self._bloom is None:
+                raise
+            logger.exception('Revoked token poll failed')
+        finally:
+            self._polled_at = time.monotonic()
+            self._lock.release()
+
+    def _rows(self, **filters):
+        return RevokedToken.objects.filter(expires_at__gt=timezone.now(), **filters).values_list('id', 'jti')
+
+    def _rebuild(self):
+        rows = list(self._rows())
+        bloom = BloomFilter(max(get_setting('MIN_CAPACITY'), 2 * len(rows)), get_setting('FALSE_POSITIVE_RATE'))
+        for row_id, jti in rows:
+            bloom.add(jti)
+            self._cursor = max(self._cursor, row_id)
+        self._bloom, self._count = bloom, len(rows)
+        self._built_at = time.monotonic()
+
+    def _poll(self):
+        for row_id, jti in self._rows(id__gt=max(self._cursor - ID_SLACK, 0)):
+            self._bloom.add(jti)
+            if row_id > self._cursor:
+                self._count += 1
+                self._cursor = row_id
+
+
+revoked = RevocationFilter()
+
+
+def is_revoked(jti):
+    if not jti or not revoked.might_contain(jti):
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(token):
+    """Refuse ``token`` until it expires; False when it was already revoked"""
+    jti = token[api_settings.JTI_CLAIM]
+    _, created = RevokedToken.objects.get_or_create(
+        jti=jti, defaults={'expires_at': datetime_from_epoch(token['exp'])},
+    )
+    revoked.add(jti)
+    return created
@@ -1,6 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .revocation import is_revoked, revoke
 
 User = get_user_model()
 
@@ -52,6 +57,36 @@ class UserLoginSerializer(serializers.Serializer):
         return data
 
 
+class TokenRefreshSerializer(serializers.Serializer):
+    """New access token for a refresh token; with rotation the refresh token is single use"""
+    refresh = serializers.CharField()
+    
+    def validate(self, data):
+        try:
+            refresh = RefreshToken(data['refresh'])
+        except TokenError as error:
+            raise InvalidToken(error.args[0])
+        if is_revoked(refresh.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken('Token has been revoked')
+        
+        user = User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed('No active account found for the given token.', code='no_active_account')
+        if api_settings.CHECK_REVOKE_TOKEN and refresh.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+        
+        tokens = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # The revocation insert decides between concurrent refreshes of one token
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revoke(refresh):
+                raise InvalidToken('Token has been revoked')
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            tokens['refresh'] = str(refresh)
+        return tokens
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile"""
     profile_image_url = serializers.SerializerMethodField()
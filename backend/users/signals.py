@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import forget
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_auth_snapshot(sender, instance, **kwargs):
+    # After commit: a request re-caching the row before then would read the old one
+    user_id = instance.pk  # cleared on the instance once a delete finishes
+    transaction.on_commit(lambda: forget(user_id))
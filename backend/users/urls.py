@@ -4,5 +4,7 @@ from . import views
 urlpatterns = [
     path('register/', views.register, name='register'),
     path('login/', views.login, name='login'),
+    path('refresh/', views.refresh, name='token-refresh'),
+    path('logout/', views.logout, name='logout'),
     path('profile/', views.profile, name='profile'),
 ]
@@ -1,24 +1,30 @@
 from rest_framework import status, viewsets, permissions
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, permission_classes, throttle_classes, action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.db import models
 from .serializers import (
     UserRegistrationSerializer, 
     UserLoginSerializer, 
+    TokenRefreshSerializer,
     UserProfileSerializer,
     AdminUserSerializer,
     TokenSerializer
 )
 from analytics.models import Activity
+from changes.feed import ChangeFeedMixin
+from aiverse_api.ratelimit import LoginThrottle, RegisterThrottle
+from .revocation import revoke
 
 User = get_user_model()
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 def register(request):
     """User registration endpoint"""
     serializer = UserRegistrationSerializer(data=request.data)
@@ -46,6 +52,7 @@ def register(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def login(request):
     """User login endpoint"""
     serializer = UserLoginSerializer(data=request.data)
@@ -71,6 +78,33 @@ def login(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def refresh(request):
+    """Exchange a refresh token for a new access (and, rotated, refresh) token"""
+    serializer = TokenRefreshSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def logout(request):
+    """Revoke the refresh token in the body and the access token sending it"""
+    tokens = [request.auth] if request.auth is not None else []
+    if request.data.get('refresh'):
+        try:
+            tokens.append(RefreshToken(request.data['refresh']))
+        except TokenError:
+            return Response({'error': 'Invalid refresh token'}, status=status.HTTP_400_BAD_REQUEST)
+    if not tokens:
+        return Response({'error': 'Refresh token is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    for token in tokens:
+        revoke(token)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(['GET', 'PATCH'])
 @permission_classes([IsAuthenticated])
 def profile(request):
@@ -82,6 +116,8 @@ def profile(request):
         return Response(serializer.data)
     
     elif request.method == 'PATCH':
+        # request.user may be an authentication snapshot; save the current row
+        user = User.objects.get(pk=user.pk)
         serializer = UserProfileSerializer(user, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
@@ -95,14 +131,17 @@ class IsAdminUser(permissions.BasePermission):
         return request.user and request.user.is_authenticated and request.user.is_admin
 
 
-class AdminUserViewSet(viewsets.ModelViewSet):
+class AdminUserViewSet(ChangeFeedMixin, viewsets.ModelViewSet):
     """ViewSet for admin user management"""
     queryset = User.objects.all()
     serializer_class = AdminUserSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        queryset = User.objects.all()
+        return User.objects.order_by('-created_at')
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
         
         # Filter by search query
         search = self.request.query_params.get('search', None)
@@ -113,7 +152,7 @@ class AdminUserViewSet(viewsets.ModelViewSet):
                 models.Q(full_name__icontains=search)
             )
         
-        return queryset.order_by('-created_at')
+        return queryset
     
     @action(detail=True, methods=['post'])
     def toggle_admin(self, request, pk=None):
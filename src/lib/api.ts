@@ -60,13 +60,20 @@ export const registrationApi = {
     getAll: () => api.get("/registrations/"),
     getByUser: (userId: number) => api.get(`/registrations/?user=${userId}`),
     getByEvent: (eventSlug: string) => api.get(`/registrations/?event=${eventSlug}`),
-    create: (data: any) => api.post("/registrations/", data),
+    getQueue: (admissionId: number) => api.get(`/registrations/queue/${admissionId}/`),
+    // Send the same idempotencyKey when retrying a submission; the server replays its first response
+    create: (data: any, idempotencyKey?: string) => api.post("/registrations/", data, {
+        headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {},
+    }),
 };
 
 export const paymentApi = {
     getAll: () => api.get("/payments/"),
-    create: (data: any) => api.post("/payments/", data, {
-        headers: { "Content-Type": "multipart/form-data" },
+    create: (data: any, idempotencyKey?: string) => api.post("/payments/", data, {
+        headers: {
+            "Content-Type": "multipart/form-data",
+            ...(idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {}),
+        },
     }),
     approve: (id: string) => api.post(`/payments/${id}/approve/`),
 };
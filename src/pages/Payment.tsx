@@ -24,6 +24,11 @@ const Payment = () => {
   const [copied, setCopied] = useState(false);
   const [enteredAmount, setEnteredAmount] = useState("");
   const fileInputRef = useRef<HTMLInputElement>(null);
+  // Kept until the server answers, so a resubmit after a network error is not recorded twice
+  const submission = useRef({ key: crypto.randomUUID(), transactionId: `TXN${Date.now()}` });
+  const newSubmission = () => {
+    submission.current = { key: crypto.randomUUID(), transactionId: `TXN${Date.now()}` };
+  };
 
   const UPI_ID = "7993759775@axl";
   const QR_CODE_IMAGE = "/payment-qr.jpg";
@@ -77,7 +82,7 @@ const Payment = () => {
       formData.append("email", registrationData.email);
       formData.append("amount", enteredAmount);
       formData.append("payment_screenshot", paymentScreenshot);
-      formData.append("transaction_id", `TXN${Date.now()}`); // Or ask user for it?
+      formData.append("transaction_id", submission.current.transactionId); // Or ask user for it?
       // The previous code generated transaction ID automatically. 
       // But usually user should enter it or we generate it. 
       // The UI has "Transaction ID" placeholder? No, just "Enter Amount Paid".
@@ -87,7 +92,8 @@ const Payment = () => {
       // Note: Backend 'PaymentViewSet.create' expects 'email', 'amount', 'transaction_id' (optional?), 'payment_screenshot'.
       // My backend implementation creates 'payment_screenshot' from request.
 
-      await paymentApi.create(formData);
+      await paymentApi.create(formData, submission.current.key);
+      newSubmission();
 
       // Send Payment Confirmation Email (Backend should ideally do this, but keeping frontend logic for consistency with Register)
       const registrationId = `AIVERSE4-${Date.now().toString(36).toUpperCase()}`; // Just for email display
@@ -110,8 +116,11 @@ const Payment = () => {
 
       toast.success("Payment proof uploaded successfully!");
       navigate("/payment-success");
-    } catch (error) {
+    } catch (error: any) {
       console.error("Payment error:", error);
+      if (error.response && error.response.status < 500) {
+        newSubmission();
+      }
       toast.error("❌ Payment submission failed. Please try again.");
     } finally {
       setIsProcessing(false);
@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { Helmet } from "react-helmet-async";
 import { useNavigate } from "react-router-dom";
 import { useForm } from "react-hook-form";
@@ -59,6 +59,8 @@ const years = ["1st Year", "2nd Year", "3rd Year", "4th Year", "PG - 1st Year",
 const Register = () => {
   const navigate = useNavigate();
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // Kept until the server answers, so a resubmit after a network error is not registered twice
+  const idempotencyKey = useRef(crypto.randomUUID());
 
   const form = useForm<RegistrationFormData>({
     resolver: zodResolver(registrationSchema),
@@ -81,7 +83,12 @@ const Register = () => {
 
     try {
       // Submit to backend
-      await registrationApi.create(data);
+      const response = await registrationApi.create(data, idempotencyKey.current);
+      idempotencyKey.current = crypto.randomUUID();
+      if (response.status === 202) {
+        // Capacity-limited event: the seat is confirmed by email once the queue reaches us
+        toast.info(`You're #${response.data.position} in the registration queue. We'll email you when your seat is confirmed.`);
+      }
 
       // Save registration data for Payment page
       sessionStorage.setItem("registrationData", JSON.stringify(data));
@@ -125,6 +132,9 @@ const Register = () => {
       navigate("/payment");
     } catch (error: any) {
       console.error("Registration error:", error);
+      if (error.response && error.response.status < 500) {
+        idempotencyKey.current = crypto.randomUUID();
+      }
       if (error.response?.data?.message === 'Already registered') {
         // If already registered, still proceed to payment (maybe they missed payment step)
         toast.info("You are already registered! Proceeding to payment...");